@@ -0,0 +1,88 @@
+# coding=utf-8
+
+"""Benchmarks of the project.
+
+Run from the project root, e.g. `python -m benchmarks.sessions`. Every
+benchmark uses its own throwaway test database of the configured settings.
+"""
+
+import logging
+import os
+import time
+
+SETTINGS = {
+    'ALLOWED_HOSTS': ['*'],
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    'USERS_PERFORMANCE_SAMPLE_RATE': 0,
+}
+
+
+def setup(**settings):
+    """Set up Django, override settings and create test database."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+    from django.conf import settings as project_settings
+    from django.test.utils import override_settings
+
+    # Overridden before setup, so connections are made with overridden
+    # databases in every thread
+    project_settings.INSTALLED_APPS
+    override_settings(**dict(SETTINGS, **settings)).enable()
+
+    import django
+    django.setup()
+
+    from django.db import connection
+
+    connection.creation.create_test_db(verbosity=0)
+    # Warnings such as 404 logs are not part of the measured work
+    logging.disable(logging.WARNING)
+
+
+def percentile(values, percent):
+    """Get percentile of sorted values."""
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+def measure(func, iterations):
+    """Call `func` `iterations` times, get latency stats in milliseconds."""
+    latencies = []
+    started = time.time()
+    for _ in range(iterations):
+        call_started = time.time()
+        func()
+        latencies.append((time.time() - call_started) * 1000)
+    elapsed = time.time() - started
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'throughput': iterations / elapsed,
+        'mean': sum(latencies) / len(latencies),
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+    }
+
+
+def print_table(rows, columns):
+    """Print rows of dicts as a table."""
+    widths = [
+        max([len(column)] + [len(_format(row[column])) for row in rows])
+        for column in columns
+    ]
+    print('  '.join(
+        column.ljust(width) for column, width in zip(columns, widths)
+    ))
+    for row in rows:
+        print('  '.join(
+            _format(row[column]).ljust(width)
+            for column, width in zip(columns, widths)
+        ))
+
+
+def _format(value):
+    """Format table value."""
+    if isinstance(value, float):
+        return '{:.2f}'.format(value)
+    return '{}'.format(value)
@@ -0,0 +1,111 @@
+# coding=utf-8
+
+"""Users admin changelist with estimated counts and prefix search.
+
+Seeds users into the SQLite test database and compares the changelist of
+`UserAdmin` with the stock configuration (exact counts, `icontains` search).
+SQLite has no count estimate, so counts are exact in both, estimates are
+used on PostgreSQL and MySQL only.
+"""
+
+import argparse
+import functools
+import time
+
+import benchmarks
+
+SURNAMES = ('Smith', 'Jones', 'Taylor', 'Brown', 'Williams', 'Wilson')
+REQUESTS = (
+    ('page', {}),
+    ('last page', {'p': 100}),
+    ('filter', {'is_active__exact': 1}),
+    ('search', {'q': 'user12345'}),
+    ('search surname', {'q': 'tayl'}),
+)
+
+
+def seed(count, batch_size=10000):
+    """Seed users."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    model = get_user_model()
+    password = make_password('pass')
+    for start in range(0, count, batch_size):
+        model.objects.bulk_create([
+            model(
+                email='user{}@mail.com'.format(index), name='Name',
+                surname='{}{}'.format(SURNAMES[index % len(SURNAMES)], index),
+                is_active=bool(index % 2), password=password
+            )
+            for index in range(start, min(start + batch_size, count))
+        ])
+
+
+def use_stock_admin(model_admin):
+    """Switch admin to stock exact counts and `icontains` search."""
+    from django.contrib.admin import ModelAdmin
+    from django.core.paginator import Paginator
+
+    model_admin.paginator = Paginator
+    model_admin.show_full_result_count = True
+    model_admin.search_fields = ('email', 'surname')
+    model_admin.get_search_results = functools.partial(
+        ModelAdmin.get_search_results, model_admin
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    benchmarks.setup(DATABASES={'default': {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'
+    }})
+
+    from django import test
+    from django.contrib import admin
+    from django.contrib.auth import get_user_model
+    from django.core.urlresolvers import reverse
+    from django.test.utils import CaptureQueriesContext
+    from django.db import connection
+
+    started = time.time()
+    seed(args.users)
+    print('Seeded {} users in {:.1f}s'.format(
+        args.users, time.time() - started
+    ))
+
+    superuser = get_user_model().objects.create_superuser(
+        email='admin@mail.com', password='pass', name='Name', surname='Admin'
+    )
+    client = test.Client()
+    client.force_login(superuser)
+    url = reverse('admin:users_user_changelist')
+    model_admin = admin.site._registry[get_user_model()]
+
+    rows = []
+    for variant in ('users', 'stock'):
+        if variant == 'stock':
+            use_stock_admin(model_admin)
+        for name, params in REQUESTS:
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url, params)
+            # Captured queries are a slice of the log reset by next requests
+            count = len(queries)
+            stats = benchmarks.measure(
+                lambda: client.get(url, params), args.iterations
+            )
+            stats.update(admin=variant, request=name, queries=count)
+            rows.append(stats)
+
+    benchmarks.print_table(
+        rows, ('admin', 'request', 'queries', 'mean', 'p50', 'p90')
+    )
+
+
+if __name__ == '__main__':
+    main()
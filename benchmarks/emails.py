@@ -0,0 +1,64 @@
+# coding=utf-8
+
+"""Render cost per verification email.
+
+`render_to_string` resolves URL and loads templates for every email as
+before, `compiled` renders from templates compiled once by `users.emails`.
+"""
+
+import argparse
+import itertools
+
+import benchmarks
+
+CODE = 'a' * 32
+
+
+def render_to_string(email):
+    """Render email the way it was done for every message."""
+    from django.conf import settings
+    from django.core.urlresolvers import reverse_lazy
+    from django.template.loader import render_to_string
+
+    def render():
+        url = '{}{}'.format(
+            settings.HOST, reverse_lazy(email['url'], kwargs={'code': CODE})
+        )
+        render_to_string(email['template'], {'verification_url': url})
+        email['subject'].format(host=settings.HOST)
+    return render
+
+
+def compiled(email):
+    """Render email from compiled templates, text and HTML parts."""
+    from users import emails
+
+    rendered = emails.render(email, itertools.repeat(CODE))
+    return lambda: next(rendered)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    benchmarks.setup(HOST='http://testserver')
+
+    from users import emails
+
+    rows = []
+    for name, email in (
+        ('verification', emails.VERIFICATION),
+        ('restore_password', emails.RESTORE_PASSWORD),
+    ):
+        for renderer in (render_to_string, compiled):
+            stats = benchmarks.measure(renderer(email), args.iterations)
+            rows.append(dict(stats, email=name, renderer=renderer.__name__))
+
+    benchmarks.print_table(
+        rows, ('email', 'renderer', 'throughput', 'mean', 'p50', 'p99')
+    )
+
+
+if __name__ == '__main__':
+    main()
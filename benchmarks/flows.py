@@ -0,0 +1,232 @@
+# coding=utf-8
+
+"""Latency, queries per request and throughput of the users flows.
+
+Every flow of `users.urls` is run `--iterations` times with the test client
+against the SQLite test database. Results can be saved as JSON and compared
+with a saved baseline, regressions make the exit status non-zero.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+
+import benchmarks
+
+PASSWORD = 'pass'
+
+
+def create_users(prefix, count, **kwargs):
+    """Create users for flow."""
+    from django.contrib.auth import get_user_model
+
+    return [
+        get_user_model().objects.create_user(
+            email='{}{}@mail.com'.format(prefix, index), password=PASSWORD,
+            name='Name', surname='Surname', **kwargs
+        )
+        for index in range(count)
+    ]
+
+
+def registration(iterations):
+    """Register new users."""
+    from django import test
+    from django.core.urlresolvers import reverse
+
+    url = reverse('users:registration')
+    indexes = itertools.count()
+
+    def flow():
+        test.Client().post(url, {
+            'email': 'registration{}@mail.com'.format(next(indexes)),
+            'name': 'Name', 'surname': 'Surname', 'password': PASSWORD,
+            'confirm_password': PASSWORD
+        })
+    return flow
+
+
+def authentication(iterations):
+    """Log in active user."""
+    from django import test
+    from django.core.urlresolvers import reverse
+
+    url = reverse('users:authentication')
+    user, = create_users('authentication', 1, is_active=True)
+
+    def flow():
+        test.Client().post(url, {'email': user.email, 'password': PASSWORD})
+    return flow
+
+
+def verification(iterations):
+    """Activate users by verification links."""
+    from django import test
+    from django.core.urlresolvers import reverse
+    from users import models
+
+    urls = iter([
+        reverse('users:verification', kwargs={'code': code})
+        for code in (
+            models.Verification.objects.issue(
+                user, models.Verification.PURPOSE_ACTIVATION
+            )[0].code
+            for user in create_users('verification', iterations)
+        )
+    ])
+
+    def flow():
+        test.Client().get(next(urls))
+    return flow
+
+
+def reverification(iterations):
+    """Request verification emails again."""
+    from django import test
+    from django.core.urlresolvers import reverse
+
+    url = reverse('users:reverification')
+    users = iter(create_users('reverification', iterations))
+
+    def flow():
+        test.Client().post(url, {'email': next(users).email})
+    return flow
+
+
+def restore_password(iterations):
+    """Request restore password emails."""
+    from django import test
+    from django.core.urlresolvers import reverse
+
+    url = reverse('users:password.restore')
+    users = iter(create_users('restore', iterations, is_active=True))
+
+    def flow():
+        test.Client().post(url, {'email': next(users).email})
+    return flow
+
+
+def restore_password_change(iterations):
+    """Change passwords by restore links."""
+    from django import test
+    from django.core.urlresolvers import reverse
+    from users import models
+
+    urls = iter([
+        reverse('users:password.restore.change', kwargs={'code': code})
+        for code in (
+            models.Verification.objects.issue(
+                user, models.Verification.PURPOSE_RESTORE_PASSWORD
+            )[0].code
+            for user in create_users('change', iterations, is_active=True)
+        )
+    ])
+
+    def flow():
+        test.Client().post(next(urls), {
+            'password': PASSWORD, 'confirm_password': PASSWORD
+        })
+    return flow
+
+
+FLOWS = (
+    registration, authentication, verification, reverification,
+    restore_password, restore_password_change,
+)
+
+
+def run(flow, iterations):
+    """Run flow, get its stats with average count of queries."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    queries = [0]
+
+    def measured():
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as context:
+            flow()
+        queries[0] += len(context)
+
+    stats = benchmarks.measure(measured, iterations)
+    stats['queries'] = queries[0] / float(iterations)
+    return stats
+
+
+def compare(results, baseline, tolerance):
+    """Get regressions of results against baseline."""
+    regressions = []
+    for name, stats in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if stats['queries'] > base['queries']:
+            regressions.append('{}: queries {:.1f} > {:.1f}'.format(
+                name, stats['queries'], base['queries']
+            ))
+        for metric in ('p50', 'p90'):
+            if stats[metric] > base[metric] * (1 + tolerance):
+                regressions.append('{}: {} {:.2f}ms > {:.2f}ms'.format(
+                    name, metric, stats[metric], base[metric]
+                ))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument(
+        '--flow', action='append', choices=[flow.__name__ for flow in FLOWS],
+        help='Flow to run, all by default.'
+    )
+    parser.add_argument('--output', help='Path to save results as JSON.')
+    parser.add_argument('--baseline', help='Path of results to compare.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='Allowed latency increase against baseline (0.2 is 20%%).'
+    )
+    args = parser.parse_args()
+
+    benchmarks.setup(DATABASES={'default': {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'
+    }})
+
+    import django
+
+    results = {}
+    rows = []
+    for flow in FLOWS:
+        if args.flow and flow.__name__ not in args.flow:
+            continue
+        stats = run(flow(args.iterations), args.iterations)
+        results[flow.__name__] = stats
+        rows.append(dict(stats, flow=flow.__name__))
+
+    benchmarks.print_table(rows, (
+        'flow', 'queries', 'throughput', 'mean', 'p50', 'p90', 'p99'
+    ))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'iterations': args.iterations,
+                'flows': results,
+            }, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(
+                results, json.load(baseline)['flows'], args.tolerance
+            )
+        for regression in regressions:
+            print('Regression: {}'.format(regression))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
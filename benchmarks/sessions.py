@@ -0,0 +1,72 @@
+# coding=utf-8
+
+"""Requests per second of login and next page flow for session engines."""
+
+import argparse
+
+import benchmarks
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+EMAIL = 'benchmark@mail.com'
+PASSWORD = 'pass'
+
+
+def login(url, next_url):
+    """Log in with a fresh client and open a page which needs the session.
+
+    `LOGIN_REDIRECT_URL` has no view in this project, admin index is the
+    page which loads the user of the session instead.
+    """
+    from django import test
+
+    client = test.Client()
+    response = client.post(url, {'email': EMAIL, 'password': PASSWORD})
+    assert response.status_code == 302, response.status_code
+    response = client.get(next_url)
+    assert response.status_code == 200, response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    # Cheap hasher, so session handling is not hidden behind the hash cost
+    benchmarks.setup(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.MD5PasswordHasher'
+    ])
+
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.core.urlresolvers import reverse
+    from django.test.utils import override_settings
+
+    get_user_model().objects.create_user(
+        email=EMAIL, password=PASSWORD, name='Name', surname='Surname',
+        is_active=True, is_staff=True
+    )
+    url = reverse('users:authentication')
+    next_url = reverse('admin:index')
+
+    rows = []
+    for engine in ENGINES:
+        with override_settings(SESSION_ENGINE=engine):
+            cache.clear()
+            stats = benchmarks.measure(
+                lambda: login(url, next_url), args.iterations
+            )
+        stats['engine'] = engine.rsplit('.', 1)[-1]
+        rows.append(stats)
+
+    benchmarks.print_table(
+        rows, ('engine', 'throughput', 'mean', 'p50', 'p90', 'p99')
+    )
+
+
+if __name__ == '__main__':
+    main()
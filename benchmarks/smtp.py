@@ -0,0 +1,163 @@
+# coding=utf-8
+
+"""Request concurrency with a slow SMTP server, inline sending vs outbox.
+
+`--workers` threads (as threads of WSGI workers) serve `--requests`
+requests which dispatch one email each to a local SMTP stand-in answering
+every message after `--delay` seconds. `inline` sends in the request as
+it was done before the outbox, `outbox` puts email to the outbox and
+`delivery` is the time of `send_outgoing_emails` to drain it afterwards.
+
+Requests call `users.tasks` directly and do not go through the users
+views or HTTP, so the numbers are of email dispatch, not of end-to-end
+request throughput.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from django.utils.six.moves import socketserver
+
+import benchmarks
+
+
+class SlowSMTPHandler(socketserver.StreamRequestHandler):
+
+    """Minimal SMTP session which answers every message with a delay."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                time.sleep(self.server.delay)
+                self.reply('250 OK')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SlowSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+
+    """SMTP stand-in serving every connection in a thread."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, delay):
+        socketserver.TCPServer.__init__(
+            self, ('127.0.0.1', 0), SlowSMTPHandler
+        )
+        self.delay = delay
+
+
+def inline(index):
+    """Send email over SMTP in the request."""
+    from users import tasks
+
+    tasks.send_messages([tasks.build_message(
+        email='user{}@mail.com'.format(index), subject='Subject',
+        message='Message'
+    )])
+
+
+def outbox(index):
+    """Put email to the outbox in the request."""
+    from users import tasks
+
+    tasks.send_email(
+        email='user{}@mail.com'.format(index), subject='Subject',
+        message='Message'
+    )
+
+
+def serve(dispatch, workers, requests):
+    """Serve requests by worker threads, get stats in milliseconds."""
+    from django.db import connection
+
+    def request(index):
+        started = time.time()
+        try:
+            dispatch(index)
+        finally:
+            connection.close()
+        return (time.time() - started) * 1000
+
+    pool = ThreadPool(workers)
+    started = time.time()
+    latencies = sorted(pool.map(request, range(requests)))
+    elapsed = time.time() - started
+    pool.close()
+    return {
+        'throughput': requests / elapsed,
+        'p50': benchmarks.percentile(latencies, 50),
+        'p99': benchmarks.percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = SlowSMTPServer(args.delay)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    # Worker threads need a database shared by connections
+    directory = tempfile.mkdtemp()
+    database = os.path.join(directory, 'smtp.sqlite3')
+    try:
+        benchmarks.setup(
+            DATABASES={'default': {
+                'ENGINE': 'django.db.backends.sqlite3', 'NAME': database,
+                'TEST': {'NAME': database},
+            }},
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1],
+            DEFAULT_FROM_EMAIL='benchmark@mail.com'
+        )
+
+        from django.db import connection
+        from users import models, tasks
+
+        rows = []
+        for dispatch in (inline, outbox):
+            stats = serve(dispatch, args.workers, args.requests)
+            rows.append(dict(stats, mode=dispatch.__name__, delivery='-'))
+
+        started = time.time()
+        while models.OutgoingEmail.objects.pending(max_attempts=1).exists():
+            tasks.send_outgoing_emails(max_attempts=1)
+        rows[-1]['delivery'] = '{:.2f}s'.format(time.time() - started)
+        connection.close()
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory)
+
+    benchmarks.print_table(
+        rows, ('mode', 'throughput', 'p50', 'p99', 'delivery')
+    )
+
+
+if __name__ == '__main__':
+    main()
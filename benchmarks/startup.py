@@ -0,0 +1,74 @@
+# coding=utf-8
+
+"""Startup time of a fresh WSGI worker with and without warm up.
+
+Workers use templates configuration of production. Every run is a new
+process which imports `wsgi` (`import`) and serves the first request
+(`first`), `total` is the time from process start to the first response,
+as seen by a request routed to a new worker.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import benchmarks
+
+WORKER = '''
+import json, sys, time
+started = time.time()
+from settings.production import TEMPLATES
+from django.conf import settings
+settings.WARMUP = {warmup}
+settings.ALLOWED_HOSTS = ['*']
+settings.TEMPLATES = TEMPLATES
+import wsgi
+imported = time.time()
+wsgi.application({{
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': {path!r}, 'SERVER_NAME': 'worker',
+    'SERVER_PORT': '80', 'wsgi.url_scheme': 'http', 'wsgi.input': sys.stdin,
+    'wsgi.errors': sys.stderr,
+}}, lambda status, headers: None)
+responded = time.time()
+print(json.dumps({{
+    'import': (imported - started) * 1000,
+    'first': (responded - imported) * 1000,
+    'total': (responded - started) * 1000,
+}}))
+'''
+
+
+def run_worker(warmup, path):
+    """Run worker process, get its timings in milliseconds."""
+    with open(os.devnull, 'w') as devnull:
+        output = subprocess.check_output([
+            sys.executable, '-c', WORKER.format(warmup=warmup, path=path)
+        ], stderr=devnull)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--path', default='/users/registration/')
+    args = parser.parse_args()
+
+    rows = []
+    for warmup in (False, True):
+        runs = [run_worker(warmup, args.path) for _ in range(args.iterations)]
+        row = {'warmup': warmup}
+        for metric in ('import', 'first', 'total'):
+            values = sorted(run[metric] for run in runs)
+            row[metric] = sum(values) / len(values)
+            row['{} p90'.format(metric)] = benchmarks.percentile(values, 90)
+        rows.append(row)
+
+    benchmarks.print_table(rows, (
+        'warmup', 'import', 'first', 'first p90', 'total', 'total p90'
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# coding=utf-8
+
+"""Render time of registration and authentication pages per loader.
+
+`app_directories` is the base configuration, `cached` is the production
+one and `cached+warmup` is the production one after `warmup.templates()`.
+`first` is the latency of the first request of a fresh worker.
+"""
+
+import argparse
+import time
+
+import benchmarks
+
+VIEWS = ('users:registration', 'users:authentication')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    benchmarks.setup()
+
+    from django import test
+    from django.conf import settings
+    from django.core.urlresolvers import reverse
+    from django.test.utils import override_settings
+
+    from settings import production
+    import warmup
+
+    configurations = (
+        ('app_directories', settings.TEMPLATES, False),
+        ('cached', production.TEMPLATES, False),
+        ('cached+warmup', production.TEMPLATES, True),
+    )
+
+    rows = []
+    for name, templates, warm in configurations:
+        for view in VIEWS:
+            url = reverse(view)
+            # Fresh template engines as in a new worker
+            with override_settings(TEMPLATES=templates):
+                if warm:
+                    warmup.templates()
+                client = test.Client()
+                started = time.time()
+                client.get(url)
+                first = (time.time() - started) * 1000
+                stats = benchmarks.measure(
+                    lambda: client.get(url), args.iterations
+                )
+            rows.append(dict(stats, loaders=name, view=view, first=first))
+
+    benchmarks.print_table(rows, (
+        'loaders', 'view', 'first', 'throughput', 'mean', 'p50', 'p99'
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,14 @@
 # coding=utf-8
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.text import capfirst
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from . import models, forms
+from . import exports, models, forms, paginators, snapshots, tasks
 
 
 class UserAdmin(BaseUserAdmin):
@@ -16,9 +20,15 @@ class UserAdmin(BaseUserAdmin):
 
     list_display = ('email', 'name', 'surname')
     list_filter = ('is_staff', 'is_active', 'is_superuser')
-    search_fields = ('email', 'phone', 'surname', 'specialty')
+    search_fields = ('^email', '^surname')
     ordering = ('email',)
     filter_horizontal = tuple()
+    actions = (
+        'activate', 'deactivate', 'resend_verification', 'export_csv',
+        'export_jsonl',
+    )
+    paginator = paginators.EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (_('Personal information'), {
@@ -42,4 +52,78 @@ class UserAdmin(BaseUserAdmin):
         """Has module permission."""
         return request.user.is_superuser
 
+    def get_search_results(self, request, queryset, search_term):
+        """Search by prefix of email or surname.
+
+        Prefix lookups are served by the indexes (`_like` ones on
+        PostgreSQL), emails are stored lowercased.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        lookups = (
+            Q(email__startswith=search_term.lower()) |
+            Q(surname__startswith=search_term) |
+            Q(surname__startswith=capfirst(search_term))
+        )
+        return queryset.filter(lookups), False
+
+    def _set_active(self, request, queryset, is_active):
+        """Update active state of users with a single statement."""
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = models.User.objects.filter(pk__in=pks).update(
+            is_active=is_active
+        )
+        snapshots.forget(*pks)
+        self.message_user(
+            request, _('%d users updated') % updated, messages.SUCCESS
+        )
+
+    def activate(self, request, queryset):
+        """Activate users."""
+        self._set_active(request, queryset, True)
+    activate.short_description = _('Activate selected users')
+
+    def deactivate(self, request, queryset):
+        """Deactivate users."""
+        self._set_active(request, queryset, False)
+    deactivate.short_description = _('Deactivate selected users')
+
+    def resend_verification(self, request, queryset):
+        """Resend verification emails to inactive users."""
+        with transaction.atomic():
+            verifications = models.Verification.objects.bulk_issue(
+                queryset.filter(is_active=False),
+                models.Verification.PURPOSE_ACTIVATION
+            )
+            tasks.queue_verification_emails(verifications)
+        self.message_user(
+            request, _('%d verification emails queued') % len(verifications),
+            messages.SUCCESS
+        )
+    resend_verification.short_description = _(
+        'Resend verification to selected inactive users'
+    )
+
+    def export(self, queryset, export_format):
+        """Stream export of users."""
+        response = StreamingHttpResponse(
+            exports.export(queryset, export_format),
+            content_type=exports.FORMATS[export_format]
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="users.{}"'.format(export_format)
+        )
+        return response
+
+    def export_csv(self, request, queryset):
+        """Export users to CSV."""
+        return self.export(queryset, 'csv')
+    export_csv.short_description = _('Export selected users to CSV')
+
+    def export_jsonl(self, request, queryset):
+        """Export users to JSON lines."""
+        return self.export(queryset, 'jsonl')
+    export_jsonl.short_description = _('Export selected users to JSON lines')
+
 admin.site.register(models.User, UserAdmin)
@@ -0,0 +1,25 @@
+# coding=utf-8
+
+from django.contrib.auth.backends import ModelBackend
+
+from . import snapshots
+
+
+class CachedModelBackend(ModelBackend):
+
+    """Model backend which caches users loaded for sessions.
+
+    Snapshot is removed on `User.save` and `User.delete`, bulk updates of
+    users must call `snapshots.forget`.
+    """
+
+    def get_user(self, user_id):
+        """Get user by id."""
+        user = snapshots.load(user_id)
+        if user is not None:
+            return user
+
+        user = super(CachedModelBackend, self).get_user(user_id)
+        if user is not None:
+            snapshots.remember(user)
+        return user
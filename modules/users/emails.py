@@ -1,13 +1,103 @@
 # coding=utf-8
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.core.urlresolvers import reverse
+from django.dispatch import receiver
+from django.template import Context, Engine, engines
 
 VERIFICATION = {
-    'subject': 'Confirm your registration on {}'.format(settings.HOST),
-    'template': 'users/email/verification.html'
+    'subject': 'Confirm your registration on {host}',
+    'template': 'users/email/verification.html',
+    'text_template': 'users/email/verification.txt',
+    'url': 'users:verification',
 }
 
 RESTORE_PASSWORD = {
-    'subject': 'Restore password on {}'.format(settings.HOST),
-    'template': 'users/email/restore_password.html'
+    'subject': 'Restore password on {host}',
+    'template': 'users/email/restore_password.html',
+    'text_template': 'users/email/restore_password.txt',
+    'url': 'users:password.restore.change',
 }
+
+# Code reversed once to split URL of email into prefix and suffix
+CODE_PLACEHOLDER = 'CODE'
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+_compiled = {}
+_engine = None
+
+
+def get_engine():
+    """Get template engine of emails.
+
+    It is the project engine with its loaders wrapped in the cached loader,
+    so parents of email templates are not parsed again on every render.
+    """
+    global _engine
+    if _engine is None:
+        engine = engines['django'].engine
+        loaders = []
+        for loader in engine.loaders:
+            cached = isinstance(loader, (list, tuple)) and (
+                loader[0] == CACHED_LOADER
+            )
+            if cached:
+                loaders.extend(loader[1])
+            else:
+                loaders.append(loader)
+        _engine = Engine(
+            dirs=engine.dirs, debug=engine.debug,
+            loaders=[(CACHED_LOADER, loaders)],
+            string_if_invalid=engine.string_if_invalid,
+            file_charset=engine.file_charset, libraries=engine.libraries,
+            builtins=[
+                builtin for builtin in engine.builtins
+                if builtin not in Engine.default_builtins
+            ]
+        )
+    return _engine
+
+
+def compile_email(email):
+    """Get compiled templates, subject and URL parts, once per process."""
+    compiled = _compiled.get(email['template'])
+    if compiled is None:
+        url = reverse(email['url'], kwargs={'code': CODE_PLACEHOLDER})
+        prefix, suffix = url.split(CODE_PLACEHOLDER, 1)
+        engine = get_engine()
+        compiled = _compiled[email['template']] = {
+            'subject': email['subject'].format(host=settings.HOST),
+            'template': engine.get_template(email['template']),
+            'text_template': engine.get_template(email['text_template']),
+            'prefix': settings.HOST + prefix,
+            'suffix': suffix,
+        }
+    return compiled
+
+
+def render(email, codes):
+    """Render email for every verification code one by one.
+
+    Yield dicts of `subject`, plain text `message` and `html_message`.
+    """
+    compiled = compile_email(email)
+    context = Context()
+    for code in codes:
+        url = compiled['prefix'] + code + compiled['suffix']
+        with context.push(verification_url=url):
+            yield {
+                'subject': compiled['subject'],
+                'message': compiled['text_template'].render(context),
+                'html_message': compiled['template'].render(context),
+            }
+
+
+@receiver(setting_changed)
+def reset_compiled(setting, **kwargs):
+    """Compile emails again when their settings are changed (in tests)."""
+    global _engine
+    if setting in ('HOST', 'ROOT_URLCONF', 'TEMPLATES'):
+        _compiled.clear()
+        _engine = None
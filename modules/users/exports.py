@@ -0,0 +1,73 @@
+# coding=utf-8
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import six
+from django.utils.encoding import force_bytes
+
+FIELDS = (
+    'id', 'email', 'name', 'surname', 'is_active', 'is_staff',
+    'is_superuser', 'last_login',
+)
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+
+
+class Echo(object):
+
+    """File-like object which returns written value."""
+
+    def write(self, value):
+        return value
+
+
+def iter_values(queryset, fields=FIELDS, chunk_size=CHUNK_SIZE):
+    """Iterate value tuples of queryset fetched by chunks.
+
+    Chunks are selected by primary key ranges instead of offsets, so every
+    chunk costs the same and only one chunk is held in memory.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', *fields)
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        count = 0
+        for row in chunk[:chunk_size].iterator():
+            last_pk = row[0]
+            count += 1
+            yield row[1:]
+        if count < chunk_size:
+            break
+
+
+def _csv_value(value):
+    """Prepare value for CSV writer."""
+    if value is None:
+        return ''
+    if six.PY2 and isinstance(value, six.text_type):
+        return force_bytes(value)
+    return value
+
+
+def export(queryset, export_format, fields=FIELDS, chunk_size=CHUNK_SIZE):
+    """Iterate lines of queryset exported to CSV or JSON lines."""
+    rows = iter_values(queryset, fields, chunk_size)
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([_csv_value(value) for value in row])
+    elif export_format == 'jsonl':
+        for row in rows:
+            yield json.dumps(
+                dict(zip(fields, row)), cls=DjangoJSONEncoder
+            ) + '\n'
+    else:
+        raise ValueError('Unknown format: {}'.format(export_format))
@@ -1,11 +1,12 @@
 # coding=utf-8
 
 from django import forms
+from django.db import transaction
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django.contrib.auth import get_user_model
 
-from . import models, tasks
+from . import hashing, models, tasks
 
 
 class RegistrationForm(forms.ModelForm):
@@ -24,15 +25,6 @@ class RegistrationForm(forms.ModelForm):
         model = get_user_model()
         fields = ('email', 'name', 'surname')
 
-    def clean_email(self):
-        """Clean email."""
-        email = self.cleaned_data['email']
-
-        if get_user_model().objects.filter(email=email).exists():
-            raise forms.ValidationError(self.EMAIL_ALREADY_USED)
-
-        return email
-
     def clean_confirm_password(self):
         """Clean passwords."""
         password = self.cleaned_data['password']
@@ -43,12 +35,25 @@ class RegistrationForm(forms.ModelForm):
 
         return password
 
+    def validate_unique(self):
+        """Skip uniqueness queries, email is checked by database on save."""
+
     def save(self, *args, **kwargs):
-        """Save form."""
+        """Save form, `None` is returned if email is already used."""
         del self.cleaned_data['confirm_password']
-        user = get_user_model().objects.create_user(**self.cleaned_data)
-        verification = models.Verification.objects.create(user=user)
-        tasks.send_verification_email(verification)
+        with transaction.atomic():
+            try:
+                user = get_user_model().objects.create_user(
+                    **self.cleaned_data
+                )
+            except models.EmailAlreadyUsed:
+                self.add_error('email', self.EMAIL_ALREADY_USED)
+                return None
+            # New user has nothing to reuse, so verification is not looked up
+            verification, = models.Verification.objects.bulk_issue(
+                [user], models.Verification.PURPOSE_ACTIVATION
+            )
+            tasks.send_verification_email(verification)
         return user
 
 
@@ -68,9 +73,15 @@ class RestorePasswordRequestForm(forms.Form):
 
     def save(self, *args, **kwargs):
         """Save form."""
-        user = get_user_model().objects.get(email=self.cleaned_data['email'])
-        verification = models.Verification.objects.create(user=user)
-        tasks.send_restore_password_email(verification)
+        user = get_user_model().objects.get_by_natural_key(
+            self.cleaned_data['email']
+        )
+        with transaction.atomic():
+            verification, created = models.Verification.objects.issue(
+                user, models.Verification.PURPOSE_RESTORE_PASSWORD
+            )
+            if created:
+                tasks.send_restore_password_email(verification)
 
 class RestorePasswordChangeForm(forms.Form):
 
@@ -107,7 +118,9 @@ class PasswordChangeForm(RestorePasswordChangeForm):
         """Clean current password."""
         current_password = self.cleaned_data['current_password']
 
-        if not self.user.check_password(current_password):
+        if not hashing.run(
+            self.user.check_password, current_password
+        ):
             raise forms.ValidationError(self.PASSWORD_INCORRECT)
 
 
@@ -167,6 +180,12 @@ class ReverificationForm(forms.Form):
 
     def save(self, *args, **kwargs):
         """Save form."""
-        user = get_user_model().objects.get(email=self.cleaned_data['email'])
-        verification = models.Verification.objects.create(user=user)
-        tasks.send_verification_email(verification)
+        user = get_user_model().objects.get_by_natural_key(
+            self.cleaned_data['email']
+        )
+        with transaction.atomic():
+            verification, created = models.Verification.objects.issue(
+                user, models.Verification.PURPOSE_ACTIVATION
+            )
+            if created:
+                tasks.send_verification_email(verification)
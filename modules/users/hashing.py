@@ -0,0 +1,123 @@
+# coding=utf-8
+
+import contextlib
+import logging
+import multiprocessing
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolSaturated(Exception):
+
+    """Hashing pool has no free slot and its queue is full."""
+
+
+class HashingPool(object):
+
+    """Bounded pool of password hashing slots with admission control.
+
+    At most `size` hashes run at the same time, at most `queue_size` callers
+    wait for a free slot up to `timeout` seconds, others are rejected with
+    `PoolSaturated` right away instead of piling up on the CPU.
+    """
+
+    def __init__(self, size, queue_size, timeout):
+        self.size = size
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.completed = 0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Occupy slot for the duration of the block."""
+        with self._condition:
+            if self.active >= self.size:
+                self._wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.active -= 1
+                self.completed += 1
+                self._condition.notify()
+
+    def _wait(self):
+        """Wait for free slot, the condition lock must be held."""
+        if self.waiting >= self.queue_size:
+            self._reject()
+        self.waiting += 1
+        try:
+            deadline = time.time() + self.timeout
+            while self.active >= self.size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._reject()
+                self._condition.wait(remaining)
+        finally:
+            self.waiting -= 1
+
+    def _reject(self):
+        """Reject caller."""
+        self.rejected += 1
+        logger.warning('Hashing pool saturated: %s', self.stats())
+        raise PoolSaturated
+
+    def run(self, func, *args, **kwargs):
+        """Call `func` in a slot of the pool."""
+        with self.slot():
+            return func(*args, **kwargs)
+
+    def stats(self):
+        """Get pool metrics."""
+        return {
+            'size': self.size, 'active': self.active,
+            'waiting': self.waiting, 'rejected': self.rejected,
+            'completed': self.completed
+        }
+
+
+def get_pool():
+    """Get hashing pool configured by `USERS_HASHING_*` settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    size=(
+                        settings.USERS_HASHING_POOL_SIZE or
+                        multiprocessing.cpu_count()
+                    ),
+                    queue_size=settings.USERS_HASHING_QUEUE_SIZE,
+                    timeout=settings.USERS_HASHING_TIMEOUT
+                )
+    return _pool
+
+
+def run(func, *args, **kwargs):
+    """Call password hashing `func` in the hashing pool."""
+    with timing.timer('hash'):
+        return get_pool().run(func, *args, **kwargs)
+
+
+@receiver(setting_changed)
+def reset_pool(setting, **kwargs):
+    """Rebuild pool when its settings are changed (in tests)."""
+    global _pool
+    if setting.startswith('USERS_HASHING_'):
+        _pool = None
@@ -0,0 +1,238 @@
+# coding=utf-8
+
+"""Import time profile of project startup, see `profile_startup` command.
+
+Run in a fresh process, so only standard library is imported here and
+everything else is measured.
+"""
+
+import importlib
+import json
+import os
+import sys
+import time
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+
+class ImportProfiler(object):
+
+    """Self and cumulative import time of every module, like -X importtime.
+
+    Both `__import__` and `importlib.import_module` (used by app registry)
+    are measured while profiler is active.
+    """
+
+    def __init__(self):
+        self.modules = []
+        self.phase = None
+        # Seconds spent by profiler itself
+        self.overhead = 0.0
+        self._children = []
+        self._known = set(sys.modules)
+        self._import = builtins.__import__
+        self._import_module = importlib.import_module
+
+    def __enter__(self):
+        builtins.__import__ = self._measured(self._import)
+        importlib.import_module = self._measured(self._import_module)
+        return self
+
+    def __exit__(self, *args):
+        builtins.__import__ = self._import
+        importlib.import_module = self._import_module
+
+    def _measured(self, func):
+        """Wrap import function to record modules it imports."""
+        def measured(name, *args, **kwargs):
+            count = len(sys.modules)
+            self._children.append(0.0)
+            started = time.time()
+            try:
+                return func(name, *args, **kwargs)
+            finally:
+                finished = time.time()
+                elapsed = finished - started
+                children = self._children.pop()
+                recorded = len(sys.modules) != count and self._record(
+                    get_requested(func, name, *args, **kwargs),
+                    elapsed, children
+                )
+                overhead = time.time() - finished
+                self.overhead += overhead
+                if self._children:
+                    # Calls which imported nothing new pass their children up
+                    self._children[-1] += overhead + (
+                        elapsed if recorded else children
+                    )
+        return measured
+
+    def _record(self, requested, elapsed, children):
+        """Record requested module if it is imported for the first time.
+
+        Modules are put to `sys.modules` before their code is run, so new
+        modules which were not requested are left to outer imports.
+        """
+        new = [
+            module for module in set(sys.modules).difference(self._known)
+            if module in requested and sys.modules[module] is not None
+        ]
+        if not new:
+            return False
+        self._known.update(new)
+        self.modules.append({
+            'name': max(new, key=len), 'phase': self.phase,
+            'self': (elapsed - children) * 1000, 'cumulative': elapsed * 1000,
+        })
+        return True
+
+
+def get_requested(func, name, globals=None, locals=None, fromlist=(),
+                  level=-1, package=None):
+    """Get names of modules (with parents) requested by import call."""
+    if func is importlib.import_module:
+        # `import_module(name, package)`, package is the second argument
+        package = package or globals
+        globals, level = None, 0
+        if name.startswith('.'):
+            dots = len(name) - len(name.lstrip('.'))
+            package = package.rsplit('.', dots - 1)[0]
+            name = name[dots:]
+            names = [package + '.' + name if name else package]
+        else:
+            names = [name]
+    else:
+        names = [name] if level <= 0 else []
+        if level != 0 and globals:
+            # Relative import, implicit one of Python 2 when level is -1
+            package = globals.get('__package__') or globals.get('__name__')
+            if package and '__path__' not in globals and (
+                not globals.get('__package__')
+            ):
+                package = package.rpartition('.')[0]
+            if package and level > 1:
+                package = package.rsplit('.', level - 1)[0]
+            if package:
+                names.append(package + '.' + name if name else package)
+    requested = set()
+    for module in names:
+        requested.update(
+            module + '.' + item for item in fromlist or () if item != '*'
+        )
+        while module:
+            requested.add(module)
+            module = module.rpartition('.')[0]
+    return requested
+
+
+def load_settings():
+    """Import settings module."""
+    from django.conf import settings
+    settings.INSTALLED_APPS
+
+
+def setup_apps():
+    """Set up app registry, import apps and their models."""
+    import django
+    django.setup()
+
+
+def autodiscover():
+    """Import admin modules of apps."""
+    from django.contrib import admin
+    admin.autodiscover()
+
+
+def load_urls():
+    """Import URLconf."""
+    from django.core.urlresolvers import get_resolver
+    get_resolver().url_patterns
+
+
+PHASES = (
+    ('settings', load_settings),
+    ('apps', setup_apps),
+    ('admin', autodiscover),
+    ('urls', load_urls),
+)
+
+
+def get_used_paths(paths):
+    """Get files with code executed while serving requests of paths."""
+    from django import test
+    from django.conf import settings
+
+    settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+    client = test.Client()
+    used = set()
+    root = sys._getframe()
+
+    def profile(frame, event, arg):
+        if event != 'call':
+            return
+        # Code run by imports of modules is not use of their code
+        caller = frame
+        while caller is not None and caller is not root:
+            if caller.f_code.co_name == '<module>':
+                return
+            caller = caller.f_back
+        used.add(frame.f_code.co_filename)
+
+    sys.setprofile(profile)
+    try:
+        for path in paths:
+            client.get(path)
+    finally:
+        sys.setprofile(None)
+    return used
+
+
+def get_apps(modules, used):
+    """Get import time of installed apps and whether their code was used."""
+    from django.apps import apps
+
+    result = []
+    for app_config in apps.get_app_configs():
+        prefix = app_config.name + '.'
+        result.append({
+            'name': app_config.name,
+            'self': sum(
+                module['self'] for module in modules
+                if module['name'] == app_config.name or
+                module['name'].startswith(prefix)
+            ),
+            'used': None if used is None else any(
+                filename.startswith(app_config.path + os.sep)
+                for filename in used
+            ),
+        })
+    return result
+
+
+def main(paths):
+    """Profile startup, print result as JSON."""
+    phases = []
+    profiler = ImportProfiler()
+    with profiler:
+        for name, phase in PHASES:
+            profiler.phase = name
+            started = time.time()
+            overhead = profiler.overhead
+            phase()
+            phases.append({'name': name, 'time': (
+                time.time() - started - profiler.overhead + overhead
+            ) * 1000})
+
+    used = get_used_paths(paths) if paths else None
+    sys.stdout.write(json.dumps({
+        'total': sum(phase['time'] for phase in phases),
+        'phases': phases, 'modules': profiler.modules,
+        'apps': get_apps(profiler.modules, used),
+    }))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,51 @@
+# coding=utf-8
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils.encoding import force_bytes
+
+from users import exports
+
+FILTERS = ('is_staff', 'is_active', 'is_superuser')
+
+
+class Command(BaseCommand):
+
+    """Export users to CSV or JSON lines."""
+
+    help = 'Export users to CSV or JSON lines with constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=sorted(exports.FORMATS), default='csv',
+            help='Format of export.'
+        )
+        parser.add_argument(
+            '--output', help='Path of output file, stdout by default.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=exports.CHUNK_SIZE,
+            help='Count of users fetched per query.'
+        )
+        for field in FILTERS:
+            parser.add_argument(
+                '--{}'.format(field.replace('_', '-')), dest=field,
+                choices=('0', '1'), help='Filter by {}.'.format(field)
+            )
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        queryset = get_user_model().objects.filter(**dict(
+            (field, options[field] == '1')
+            for field in FILTERS if options[field] is not None
+        ))
+        lines = exports.export(
+            queryset, options['format'], chunk_size=options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for line in lines:
+                    output.write(force_bytes(line))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,219 @@
+# coding=utf-8
+
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils import six
+
+FORMATS = ('csv', 'jsonl')
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def read_csv(path):
+    """Read CSV rows one by one, rows with extra fields are read as `None`."""
+    if six.PY2:
+        with open(path, 'rb') as input_file:
+            for row in csv.DictReader(input_file):
+                if None in row:
+                    yield None
+                    continue
+                yield dict(
+                    (key.decode('utf-8'), (value or '').decode('utf-8'))
+                    for key, value in row.items()
+                )
+    else:
+        with io.open(path, encoding='utf-8', newline='') as input_file:
+            for row in csv.DictReader(input_file):
+                yield None if None in row else row
+
+
+def read_jsonl(path):
+    """Read JSON lines one by one, invalid lines are read as `None`."""
+    with io.open(path, encoding='utf-8') as input_file:
+        for line in input_file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else None
+
+
+class Command(BaseCommand):
+
+    """Import users from CSV or JSON lines file."""
+
+    help = (
+        'Import users from CSV or JSON lines file with email, name, surname '
+        'and password or password_hash (already hashed) fields.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of file to import.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Format of file, detected by extension by default.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Count of users inserted per statement.'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=multiprocessing.cpu_count(),
+            help='Count of password hashing processes, 0 to hash inline.'
+        )
+        parser.add_argument(
+            '--rejected', help=(
+                'Path of JSON lines file for rejected rows, '
+                '`<path>.rejected.jsonl` by default.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        path = options['path']
+        input_format = options['format'] or path.rsplit('.', 1)[-1]
+        if input_format not in FORMATS:
+            raise CommandError('Unknown format: {}'.format(input_format))
+        read = read_csv if input_format == 'csv' else read_jsonl
+
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be positive')
+
+        pool = None
+        if options['processes']:
+            pool = multiprocessing.Pool(options['processes'])
+        self.hash_passwords = pool.map if pool else map
+
+        rejected_path = (
+            options['rejected'] or '{}.rejected.jsonl'.format(path)
+        )
+        started = time.time()
+        imported = rejected = 0
+        try:
+            with io.open(rejected_path, 'w', encoding='utf-8') as output:
+                self.rejected_output = output
+                rows = enumerate(read(path), 1)
+                batch_size = options['batch_size']
+                while True:
+                    batch = list(itertools.islice(rows, batch_size))
+                    if not batch:
+                        break
+                    batch_imported, batch_rejected = self.import_batch(batch)
+                    imported += batch_imported
+                    rejected += batch_rejected
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        elapsed = time.time() - started
+        self.stdout.write(
+            'Imported: {}, rejected: {} in {:.2f}s ({:.0f} rows/s)'.format(
+                imported, rejected, elapsed,
+                (imported + rejected) / elapsed if elapsed else 0
+            )
+        )
+        if rejected:
+            self.stdout.write('Rejected rows: {}'.format(rejected_path))
+
+    def reject(self, number, row, reason):
+        """Write rejected row."""
+        self.rejected_output.write(six.text_type(json.dumps(
+            {'line': number, 'reason': reason, 'row': row}
+        )) + u'\n')
+
+    def import_batch(self, batch):
+        """Validate, hash and insert batch, return imported and rejected."""
+        model = get_user_model()
+        rows = {}
+        for number, row in batch:
+            reason = self.validate(row)
+            if reason is None:
+                email = model.objects.normalize_email(row['email'])
+                if email in rows:
+                    reason = 'Duplicate email in file'
+                else:
+                    rows[email] = (number, row)
+            if reason is not None:
+                self.reject(number, row, reason)
+
+        existing = set(model.objects.filter(
+            email__in=list(rows)
+        ).values_list('email', flat=True))
+        for email in existing:
+            number, row = rows.pop(email)
+            self.reject(number, row, 'Email already used')
+
+        users = []
+        to_hash = []
+        for email, (number, row) in sorted(rows.items()):
+            user = model(
+                email=email, name=row['name'], surname=row['surname'],
+                is_active=six.text_type(
+                    row.get('is_active', '')
+                ).lower() in TRUE_VALUES,
+                password=row.get('password_hash') or ''
+            )
+            if not user.password:
+                to_hash.append((user, row.get('password') or None))
+            users.append((number, row, user))
+        hashes = self.hash_passwords(
+            make_password, [password for _, password in to_hash]
+        )
+        for (user, _), password in zip(to_hash, hashes):
+            user.password = password
+
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([user for _, _, user in users])
+            imported = len(users)
+        except IntegrityError:
+            # Emails were taken concurrently, insert one by one
+            imported = self.insert_each(users)
+        return imported, len(batch) - imported
+
+    def insert_each(self, users):
+        """Insert users one by one rejecting duplicates."""
+        imported = 0
+        for number, row, user in users:
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError:
+                self.reject(number, row, 'Email already used')
+            else:
+                imported += 1
+        return imported
+
+    def validate(self, row):
+        """Get reason to reject row, `None` if row is valid."""
+        if row is None:
+            return 'Invalid row'
+        for field in ('email', 'name', 'surname'):
+            value = row.get(field)
+            if not value or not isinstance(value, six.string_types):
+                return 'Missing {}'.format(field)
+            max_length = get_user_model()._meta.get_field(field).max_length
+            if len(value) > max_length:
+                return 'Too long {}'.format(field)
+        try:
+            validate_email(row['email'])
+        except ValidationError:
+            return 'Invalid email'
+        if row.get('password_hash'):
+            try:
+                identify_hasher(row['password_hash'])
+            except (TypeError, ValueError):
+                return 'Unknown password hash'
+        return None
@@ -0,0 +1,110 @@
+# coding=utf-8
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+import users
+
+FORMATS = ('table', 'json')
+
+
+class Command(BaseCommand):
+
+    """Profile import time of project startup."""
+
+    help = (
+        'Measure import of settings, app registry setup, admin autodiscover '
+        'and URLconf load in a fresh process, with per-module import time. '
+        'Apps which code is not run by requests of --path are flagged.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=FORMATS, default='table',
+            help='Output format.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=30,
+            help='Count of the slowest modules in table.'
+        )
+        parser.add_argument(
+            '--path', action='append', default=[], help=(
+                'Path to request after startup to find apps which are '
+                'loaded but not used, can be repeated.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        # Directory of apps is put to `sys.path` by settings, child imports
+        # them only while measured
+        environ = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [os.path.dirname(os.path.dirname(users.__file__))] +
+            [path for path in [os.environ.get('PYTHONPATH')] if path]
+        ))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'users.importtime'] + options['path'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=environ,
+            cwd=settings.BASE_DIR
+        )
+        output, errors = process.communicate()
+        if process.returncode:
+            raise CommandError(
+                'Profiling failed:\n{}'.format(errors.decode('utf-8'))
+            )
+        profile = json.loads(output.decode('utf-8'))
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(profile, indent=2, sort_keys=True))
+            return
+
+        self.write_table(
+            ('phase', 'ms'),
+            [(phase['name'], phase['time']) for phase in profile['phases']] +
+            [('total', profile['total'])]
+        )
+        modules = sorted(
+            profile['modules'], key=lambda module: module['self'],
+            reverse=True
+        )[:options['limit']]
+        self.write_table(('module', 'phase', 'self ms', 'cumulative ms'), [
+            (module['name'], module['phase'], module['self'],
+             module['cumulative'])
+            for module in modules
+        ])
+        self.write_table(('app', 'self ms', 'used'), [
+            (app['name'], app['self'],
+             '-' if app['used'] is None else 'yes' if app['used'] else 'NO')
+            for app in sorted(
+                profile['apps'], key=lambda app: app['self'], reverse=True
+            )
+        ])
+        for app in profile['apps']:
+            if app['used'] is False:
+                self.stdout.write(
+                    'Loaded but not used: {} ({:.1f}ms)'.format(
+                        app['name'], app['self']
+                    )
+                )
+
+    def write_table(self, columns, rows):
+        """Write rows as a table followed by an empty line."""
+        rows = [
+            ['{:.2f}'.format(value) if isinstance(value, float) else
+             '{}'.format(value) for value in row]
+            for row in rows
+        ]
+        widths = [
+            max([len(column)] + [len(row[index]) for row in rows])
+            for index, column in enumerate(columns)
+        ]
+        for row in [columns] + rows:
+            self.stdout.write('  '.join(
+                value.ljust(width) for value, width in zip(row, widths)
+            ).rstrip())
+        self.stdout.write('')
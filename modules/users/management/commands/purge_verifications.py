@@ -0,0 +1,36 @@
+# coding=utf-8
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users import models, utils
+
+
+class Command(BaseCommand):
+
+    """Delete expired verifications."""
+
+    help = 'Delete expired verifications in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Count of rows deleted per statement.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Seconds to sleep between batches.'
+        )
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        started = time.time()
+        deleted = utils.delete_in_batches(
+            models.Verification.objects.filter(expired__lte=timezone.now()),
+            batch_size=options['batch_size'], interval=options['sleep']
+        )
+        self.stdout.write('Deleted {} verifications in {:.2f}s'.format(
+            deleted, time.time() - started
+        ))
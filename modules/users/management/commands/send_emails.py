@@ -0,0 +1,46 @@
+# coding=utf-8
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from users import tasks
+
+
+class Command(BaseCommand):
+
+    """Send emails from the outbox."""
+
+    help = 'Send pending emails from the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Count of emails sent per batch.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Count of attempts before email is given up.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exit when it is empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep between polls of empty outbox.'
+        )
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        while True:
+            sent, failed = tasks.send_outgoing_emails(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts']
+            )
+            if sent or failed:
+                self.stdout.write('Sent: {}, failed: {}'.format(sent, failed))
+            if sent + failed < options['batch_size']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,92 @@
+# coding=utf-8
+
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from . import hashing, timing
+
+logger = logging.getLogger('users.performance')
+
+
+class HashingPoolMiddleware(object):
+
+    """Respond with 503 when the password hashing pool is saturated."""
+
+    RETRY_AFTER = 5
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, hashing.PoolSaturated):
+            response = HttpResponse('Service is busy', status=503)
+            response['Retry-After'] = self.RETRY_AFTER
+            return response
+
+
+class PerformanceMiddleware(object):
+
+    """Measure sampled requests, report them in `Server-Timing` and log.
+
+    Wall time, database queries, template rendering, password hashing and
+    email sending are measured for `USERS_PERFORMANCE_SAMPLE_RATE` part of
+    requests, others are not touched at all. Log line also has queue depth
+    and counters of the password hashing pool.
+    """
+
+    def process_request(self, request):
+        if random.random() >= settings.USERS_PERFORMANCE_SAMPLE_RATE:
+            return
+        request.performance = {
+            'started': time.time(),
+            'cursors': [
+                (connection, connection.force_debug_cursor)
+                for connection in connections.all()
+            ],
+        }
+        for connection, _ in request.performance['cursors']:
+            connection.force_debug_cursor = True
+            connection.queries_log.clear()
+        timing.start()
+
+    def process_template_response(self, request, response):
+        if hasattr(request, 'performance'):
+            with timing.timer('render'):
+                response.render()
+        return response
+
+    def process_response(self, request, response):
+        performance = getattr(request, 'performance', None)
+        if performance is None:
+            return response
+        del request.performance
+        timings = timing.stop() or timing.Timings()
+
+        queries = 0
+        for connection, force_debug_cursor in performance['cursors']:
+            connection.force_debug_cursor = force_debug_cursor
+            for query in connection.queries_log:
+                queries += 1
+                timings.add('db', float(query['time']))
+            connection.queries_log.clear()
+        timings.add('total', time.time() - performance['started'])
+
+        metrics = dict(
+            (name, round(duration * 1000, 2))
+            for name, duration in timings.durations.items()
+        )
+        metrics['queries'] = queries
+        metrics['hashing'] = hashing.get_pool().stats()
+        response['Server-Timing'] = ', '.join(
+            '{};dur={}'.format(name, metrics[name])
+            for name in sorted(timings.durations)
+        )
+        metrics.update(
+            method=request.method, path=request.path,
+            status=response.status_code
+        )
+        logger.info(json.dumps(metrics, sort_keys=True))
+        return response
@@ -1,22 +1,46 @@
 # coding=utf-8
 
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone, crypto
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.utils.translation import ugettext_lazy as _
 
-from . import tasks
+from . import hashing, snapshots, tokens
+
+
+class EmailAlreadyUsed(IntegrityError):
+
+    """User with such email already exists."""
 
 
 class UserManager(BaseUserManager):
 
     """User database manager."""
 
+    @classmethod
+    def normalize_email(cls, email):
+        """Normalize email, the whole address is lowercased."""
+        return super(UserManager, cls).normalize_email(email).lower()
+
+    def get_by_natural_key(self, email):
+        """Get user by email."""
+        return self.get(email=self.normalize_email(email))
+
     def create_user(self, email, password, **kwargs):
-        """Create user."""
+        """Create user.
+
+        Uniqueness of email is left to the database index, `EmailAlreadyUsed`
+        is raised when it is violated.
+        """
         user = self.model(email=self.normalize_email(email), **kwargs)
-        user.set_password(password)
-        user.save()
+        hashing.run(user.set_password, password)
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError as error:
+            raise EmailAlreadyUsed(*error.args)
         return user
 
     def create_superuser(self, **kwargs):
@@ -33,7 +57,7 @@ class User(AbstractBaseUser):
 
     email = models.EmailField(unique=True, db_index=True)
     name = models.CharField(_('Name'), max_length=35)
-    surname = models.CharField(_('Surname'), max_length=35)
+    surname = models.CharField(_('Surname'), max_length=35, db_index=True)
 
     is_active = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
@@ -44,10 +68,66 @@ class User(AbstractBaseUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['name', 'surname']
 
+    # Set on users built from cached snapshot, see `snapshots`
+    snapshot_session_auth_hash = None
+
     def __unicode__(self):
         """Unicode representation."""
         return u'{}'.format(self.email)
 
+    def clean(self):
+        """Clean model."""
+        super(User, self).clean()
+        self.email = UserManager.normalize_email(self.email)
+
+    def save(self, *args, **kwargs):
+        """Save to database."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'password' in update_fields:
+            # Snapshot has no password hash, keep the stored one
+            self.load_password()
+        super(User, self).save(*args, **kwargs)
+        snapshots.forget(self.pk)
+
+    def delete(self, *args, **kwargs):
+        """Delete from database."""
+        snapshots.forget(self.pk)
+        return super(User, self).delete(*args, **kwargs)
+
+    def load_password(self):
+        """Load stored password hash of user built from snapshot."""
+        if self.snapshot_session_auth_hash is not None:
+            self.password = User.objects.filter(pk=self.pk).values_list(
+                'password', flat=True
+            ).get()
+            self.snapshot_session_auth_hash = None
+
+    def check_password(self, raw_password):
+        """Check password."""
+        self.load_password()
+        return super(User, self).check_password(raw_password)
+
+    def has_usable_password(self):
+        """Has usable password."""
+        self.load_password()
+        return super(User, self).has_usable_password()
+
+    def set_unusable_password(self):
+        """Set unusable password."""
+        self.load_password()
+        super(User, self).set_unusable_password()
+
+    def set_password(self, raw_password):
+        """Set password."""
+        super(User, self).set_password(raw_password)
+        self.snapshot_session_auth_hash = None
+
+    def get_session_auth_hash(self):
+        """Get session hash."""
+        if self.snapshot_session_auth_hash is not None:
+            return self.snapshot_session_auth_hash
+        return super(User, self).get_session_auth_hash()
+
     def get_short_name(self):
         """Get short name."""
         return u'{}'.format(self.name)
@@ -73,21 +153,173 @@ class VerificationManager(models.Manager):
         """Get active verifications."""
         return self.get_queryset().filter(expired__gt=timezone.now())
 
+    def issue(self, user, purpose):
+        """Issue verification for user, return `(verification, created)`.
+
+        Verification issued less than `USERS_VERIFICATION_RESEND_WINDOW`
+        seconds ago is reused, as well as the latest one when user already
+        has `USERS_VERIFICATION_MAX_ACTIVE` active verifications. With
+        `USERS_SIGNED_VERIFICATION` enabled verification is not saved, its
+        code is a signed token (see `tokens`).
+        """
+        window = settings.USERS_VERIFICATION_RESEND_WINDOW
+
+        if settings.USERS_SIGNED_VERIFICATION:
+            verification = self.model(
+                user=user, purpose=purpose,
+                code=tokens.make_token(user, purpose)
+            )
+            key = 'users:verification:{}:{}'.format(purpose, user.pk)
+            created = not window or cache.add(key, True, window)
+            return verification, created
+
+        latest = list(self.active().filter(
+            user=user, purpose=purpose
+        ).order_by('-expired')[:settings.USERS_VERIFICATION_MAX_ACTIVE])
+        if latest:
+            issued = latest[0].expired - self.model.LIFETIME
+            recent = timezone.now() - timezone.timedelta(seconds=window)
+            if issued > recent or (
+                len(latest) >= settings.USERS_VERIFICATION_MAX_ACTIVE
+            ):
+                return latest[0], False
+        return self.create(user=user, purpose=purpose), True
+
+    def bulk_issue(self, users, purpose):
+        """Issue new verifications for many users with a single insert."""
+        if settings.USERS_SIGNED_VERIFICATION:
+            return [
+                self.model(
+                    user=user, purpose=purpose,
+                    code=tokens.make_token(user, purpose)
+                )
+                for user in users
+            ]
+        expired = timezone.now() + self.model.LIFETIME
+        verifications = [
+            self.model(
+                user=user, purpose=purpose, code=self.model.make_code(),
+                expired=expired
+            )
+            for user in users
+        ]
+        self.bulk_create(verifications)
+        return verifications
+
+    def resolve(self, code, purpose):
+        """Get active verification by code."""
+        if settings.USERS_SIGNED_VERIFICATION:
+            user = tokens.check_token(code, purpose, self.model.LIFETIME)
+            if user is None:
+                raise self.model.DoesNotExist
+            return self.model(user=user, purpose=purpose, code=code)
+        return self.active().select_related('user').get(
+            code=code, purpose=purpose
+        )
+
+    def activate(self, code):
+        """Activate user by activation code.
+
+        Activation is a conditional update of `is_active` followed by delete
+        of the used verification, so repeated activation does nothing.
+        Return whether user was activated.
+        """
+        purpose = self.model.PURPOSE_ACTIVATION
+        with transaction.atomic(savepoint=False):
+            if settings.USERS_SIGNED_VERIFICATION:
+                user = tokens.check_token(code, purpose, self.model.LIFETIME)
+                if user is None:
+                    return False
+                return bool(User.objects.filter(
+                    pk=user.pk, is_active=False
+                ).update(is_active=True))
+
+            activated = User.objects.filter(
+                is_active=False, verifications__code=code,
+                verifications__purpose=purpose,
+                verifications__expired__gt=timezone.now()
+            ).update(is_active=True)
+            if activated:
+                self.filter(code=code).delete()
+            return bool(activated)
+
 
 class Verification(models.Model):
 
     """Verification database model."""
 
     CODE_LENGTH = 32
+    LIFETIME = timezone.timedelta(hours=24)
+
+    PURPOSE_ACTIVATION = 'activation'
+    PURPOSE_RESTORE_PASSWORD = 'restore_password'
+    PURPOSES = (
+        (PURPOSE_ACTIVATION, _('Activation')),
+        (PURPOSE_RESTORE_PASSWORD, _('Restore password')),
+    )
 
     user = models.ForeignKey(User, related_name='verifications')
-    code = models.CharField(max_length=CODE_LENGTH)
-    expired = models.DateTimeField()
+    code = models.CharField(max_length=CODE_LENGTH, unique=True)
+    purpose = models.CharField(
+        max_length=20, choices=PURPOSES, default=PURPOSE_ACTIVATION
+    )
+    expired = models.DateTimeField(db_index=True)
 
     objects = VerificationManager()
 
+    class Meta:
+        index_together = (('user', 'expired'),)
+
+    @classmethod
+    def make_code(cls):
+        """Make random code."""
+        return crypto.get_random_string(length=cls.CODE_LENGTH)
+
     def save(self, *args, **kwargs):
         """Save to database."""
-        self.code = crypto.get_random_string(length=32)
-        self.expired = timezone.now() + timezone.timedelta(hours=24)
+        if not self.code:
+            self.code = self.make_code()
+        if not self.expired:
+            self.expired = timezone.now() + self.LIFETIME
         return super(Verification, self).save(*args, **kwargs)
+
+    def consume(self):
+        """Make verification unusable after its purpose is done."""
+        if self.pk is not None:
+            self.delete()
+
+
+class OutgoingEmailManager(models.Manager):
+
+    """Outgoing email database manager."""
+
+    def pending(self, max_attempts):
+        """Get emails waiting to be sent."""
+        return self.get_queryset().filter(
+            sent__isnull=True, scheduled__lte=timezone.now(),
+            attempts__lt=max_attempts
+        )
+
+
+class OutgoingEmail(models.Model):
+
+    """Outgoing email database model (outbox)."""
+
+    email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    html_message = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    scheduled = models.DateTimeField(default=timezone.now)
+    sent = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        index_together = (('sent', 'scheduled'),)
+
+    def __unicode__(self):
+        """Unicode representation."""
+        return u'{0.email}: {0.subject}'.format(self)
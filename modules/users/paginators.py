@@ -0,0 +1,49 @@
+# coding=utf-8
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATE_QUERIES = {
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+}
+
+
+def estimate_count(model, using):
+    """Get estimated count of rows in model table, `None` if unknown.
+
+    SQLite keeps no row statistics without `ANALYZE`, it is never estimated.
+    """
+    connection = connections[using]
+    query = ESTIMATE_QUERIES.get(connection.vendor)
+    if query is None:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(query, [model._meta.db_table])
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+class EstimatedCountPaginator(Paginator):
+
+    """Paginator which estimates count of large unfiltered tables.
+
+    Exact `COUNT(*)` is a full scan, estimate from database statistics is
+    used instead when it is above `threshold` rows.
+    """
+
+    threshold = 100000
+
+    @cached_property
+    def count(self):
+        """Get count of objects."""
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+        return super(EstimatedCountPaginator, self).count
@@ -0,0 +1,60 @@
+# coding=utf-8
+
+"""Cached snapshots of users, see `backends.CachedModelBackend`.
+
+Kept apart from `backends`, so `models` can forget snapshots without
+importing `django.contrib.auth.backends`, which gets user model on import.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+SNAPSHOT_FIELDS = (
+    'email', 'name', 'surname', 'is_active', 'is_staff', 'is_superuser',
+    'last_login',
+)
+
+
+def _key(pk):
+    """Get cache key of user snapshot."""
+    return 'users:user:{}'.format(pk)
+
+
+def make_snapshot(user):
+    """Make compact snapshot of user.
+
+    Password hash itself is not cached, only the session hash derived from
+    it, which is enough for session verification.
+    """
+    snapshot = dict((field, getattr(user, field)) for field in SNAPSHOT_FIELDS)
+    snapshot['pk'] = user.pk
+    snapshot['session_auth_hash'] = user.get_session_auth_hash()
+    return snapshot
+
+
+def from_snapshot(snapshot):
+    """Build user from snapshot."""
+    snapshot = dict(snapshot)
+    session_auth_hash = snapshot.pop('session_auth_hash')
+    user = get_user_model()(**snapshot)
+    user.snapshot_session_auth_hash = session_auth_hash
+    return user
+
+
+def load(pk):
+    """Get user built from cached snapshot, `None` if it is not cached."""
+    snapshot = cache.get(_key(pk))
+    return None if snapshot is None else from_snapshot(snapshot)
+
+
+def remember(user):
+    """Put snapshot of user to the cache."""
+    cache.set(
+        _key(user.pk), make_snapshot(user), settings.USERS_USER_CACHE_TIMEOUT
+    )
+
+
+def forget(*pks):
+    """Remove snapshots of users from the cache."""
+    cache.delete_many([_key(pk) for pk in pks])
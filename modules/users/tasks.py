@@ -1,49 +1,189 @@
 # coding=utf-8
 
-from django.core.mail import send_mail
+import itertools
+
+from django.core import mail
 from django.conf import settings
-from django.core.urlresolvers import reverse_lazy
-from django.template.loader import render_to_string
+from django.db import transaction
+from django.db.models import F
+from django.db.models.query import QuerySet
+from django.utils import six, timezone
+
+from . import emails, models, timing
+
+RETRY_DELAY = 60
+# Seconds claimed emails are hidden from other workers while being sent
+LEASE_TIME = 15 * 60
+CHUNK_SIZE = 100
 
-from . import emails
+
+def send_email(email, subject, message, html_message=''):
+    """Put email to the outbox, it is sent by `send_outgoing_emails`."""
+    with timing.timer('email'):
+        models.OutgoingEmail.objects.create(
+            email=email, subject=subject, message=message,
+            html_message=html_message
+        )
 
 
-def send_email(email, subject, message):
-    """Send email."""
-    send_mail(
-        subject=subject, message=message, html_message=message,
-        recipient_list=[email], from_email=settings.DEFAULT_FROM_EMAIL
+def build_message(email, subject, message, html_message=None):
+    """Build email message."""
+    email_message = mail.EmailMultiAlternatives(
+        subject=subject, body=message, to=[email],
+        from_email=settings.DEFAULT_FROM_EMAIL
     )
+    if html_message:
+        email_message.attach_alternative(html_message, 'text/html')
+    return email_message
 
 
-def send_verification_email(verification):
-    """Send verification email."""
-    url = '{}{}'.format(
-        settings.HOST,
-        reverse_lazy('users:verification', kwargs={'code': verification.code})
+def send_messages(messages, chunk_size=CHUNK_SIZE):
+    """Send email messages reusing one connection per chunk.
+
+    Return list of `(message, error)` pairs for messages which failed.
+    """
+    failures = []
+    connection = mail.get_connection()
+    messages = iter(messages)
+    while True:
+        chunk = list(itertools.islice(messages, chunk_size))
+        if not chunk:
+            break
+        try:
+            connection.open()
+        except Exception as error:
+            failures.extend((message, error) for message in chunk)
+            continue
+        try:
+            for message in chunk:
+                try:
+                    connection.send_messages([message])
+                except Exception as error:
+                    failures.append((message, error))
+                    _reset_connection(connection)
+        finally:
+            _close_connection(connection)
+    return failures
+
+
+def _reset_connection(connection):
+    """Reopen connection after failure, next send retries it if failed."""
+    _close_connection(connection)
+    try:
+        connection.open()
+    except Exception:
+        pass
+
+
+def _close_connection(connection):
+    """Close connection ignoring errors of already broken connection."""
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def send_outgoing_emails(batch_size=CHUNK_SIZE, max_attempts=5):
+    """Send batch of pending emails from the outbox.
+
+    Emails are claimed in a short transaction by counting the attempt and
+    rescheduling them after `LEASE_TIME`, so other workers skip them while
+    they are sent and a crashed worker leaves them to be retried. Failed
+    emails are rescheduled with exponential backoff until `max_attempts`
+    is reached. Return count of sent and failed emails.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        outgoing_emails = list(models.OutgoingEmail.objects.pending(
+            max_attempts
+        ).select_for_update().order_by('scheduled')[:batch_size])
+        models.OutgoingEmail.objects.filter(pk__in=[
+            outgoing_email.pk for outgoing_email in outgoing_emails
+        ]).update(
+            attempts=F('attempts') + 1,
+            scheduled=now + timezone.timedelta(seconds=LEASE_TIME)
+        )
+
+    messages = [
+        build_message(
+            email=outgoing_email.email, subject=outgoing_email.subject,
+            message=outgoing_email.message,
+            html_message=outgoing_email.html_message
+        )
+        for outgoing_email in outgoing_emails
+    ]
+    failures = dict(
+        (id(message), error)
+        for message, error in send_messages(messages, batch_size)
     )
-    message = render_to_string(
-        emails.VERIFICATION['template'], {'verification_url': url}
+    now = timezone.now()
+    for outgoing_email, message in zip(outgoing_emails, messages):
+        outgoing_email.attempts += 1
+        if id(message) in failures:
+            delay = RETRY_DELAY * 2 ** (outgoing_email.attempts - 1)
+            outgoing_email.scheduled = now + timezone.timedelta(seconds=delay)
+            outgoing_email.error = u'{}'.format(failures[id(message)])
+        else:
+            outgoing_email.sent = now
+            outgoing_email.error = ''
+        outgoing_email.save(
+            update_fields=('attempts', 'scheduled', 'sent', 'error')
+        )
+    return len(outgoing_emails) - len(failures), len(failures)
+
+
+def _render(email, verifications):
+    """Render email fields for every verification one by one."""
+    verifications, coded = itertools.tee(verifications)
+    rendered = emails.render(
+        email, (verification.code for verification in coded)
     )
-    send_email(
-        subject=emails.VERIFICATION['subject'], message=message,
-        email=verification.user.email
+    for verification, fields in six.moves.zip(verifications, rendered):
+        fields['email'] = verification.user.email
+        yield fields
+
+
+def _send_bulk(email, verifications, chunk_size):
+    """Render emails for verifications and send them in chunks."""
+    if isinstance(verifications, QuerySet):
+        verifications = verifications.select_related('user').iterator()
+    messages = (
+        build_message(**fields) for fields in _render(email, verifications)
     )
+    return send_messages(messages, chunk_size)
+
+
+def send_verification_email(verification):
+    """Send verification email."""
+    fields, = _render(emails.VERIFICATION, [verification])
+    send_email(**fields)
+
+
+def queue_verification_emails(verifications):
+    """Put verification emails for many verifications to the outbox."""
+    models.OutgoingEmail.objects.bulk_create([
+        models.OutgoingEmail(**fields)
+        for fields in _render(emails.VERIFICATION, verifications)
+    ])
+
+
+def send_verification_emails(verifications, chunk_size=CHUNK_SIZE):
+    """Send verification emails right away reusing SMTP connection.
+
+    Return list of `(message, error)` pairs for messages which failed.
+    """
+    return _send_bulk(emails.VERIFICATION, verifications, chunk_size)
 
 
 def send_restore_password_email(verification):
     """Send email with instructions for restore password."""
-    url = '{}{}'.format(
-        settings.HOST,
-        reverse_lazy(
-            'users:password.restore.change',
-            kwargs={'code': verification.code}
-        )
-    )
-    message = render_to_string(
-        emails.RESTORE_PASSWORD['template'], {'verification_url': url}
-    )
-    send_email(
-        subject=emails.RESTORE_PASSWORD['subject'], message=message,
-        email=verification.user.email
-    )
+    fields, = _render(emails.RESTORE_PASSWORD, [verification])
+    send_email(**fields)
+
+
+def send_restore_password_emails(verifications, chunk_size=CHUNK_SIZE):
+    """Send restore password emails right away reusing SMTP connection.
+
+    Return list of `(message, error)` pairs for messages which failed.
+    """
+    return _send_bulk(emails.RESTORE_PASSWORD, verifications, chunk_size)
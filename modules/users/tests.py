@@ -1,15 +1,116 @@
 # coding=utf-8
 
+import contextlib
+import csv
+import functools
+import io
+import json
+import logging
+import os
+import shutil
+import smtplib
+import tempfile
+import time
+
 from django import test
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.db import connections
+from django.template import Template, engines
+from django.test.utils import CaptureQueriesContext
+from django.utils import six, timezone
+
+import warmup
+
+from . import (
+    backends, emails, exports, forms, hashing, models, paginators, snapshots,
+    tasks, throttling, tokens, views
+)
+
+FAILING_EMAIL_BACKEND = 'users.tests.FailingEmailBackend'
+COUNTING_EMAIL_BACKEND = 'users.tests.CountingEmailBackend'
+PENDING_EMAIL_BACKEND = 'users.tests.PendingEmailBackend'
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+
+    """Locmem email backend which counts opened connections."""
+
+    connections = 0
+
+    def open(self):
+        CountingEmailBackend.connections += 1
+        return True
+
+
+class FailingEmailBackend(BaseEmailBackend):
+
+    """Email backend which always fails."""
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPException('Unavailable')
+
+
+class PendingEmailBackend(locmem.EmailBackend):
+
+    """Locmem email backend which counts pending emails while sending."""
+
+    pending = None
+
+    def send_messages(self, email_messages):
+        PendingEmailBackend.pending = models.OutgoingEmail.objects.pending(
+            max_attempts=5
+        ).count()
+        return super(PendingEmailBackend, self).send_messages(email_messages)
+
+
+class BudgetTestMixin(object):
+
+    """Assertions of query count and wall time budgets."""
+
+    @contextlib.contextmanager
+    def assertBudget(self, queries=None, seconds=None, using='default'):
+        """Assert block issues at most `queries` and takes `seconds`."""
+        # Requests of test client reset the log, capture from its start
+        connections[using].queries_log.clear()
+        started = time.time()
+        with CaptureQueriesContext(connections[using]) as context:
+            yield
+        elapsed = time.time() - started
+
+        if queries is not None and len(context) > queries:
+            self.fail('{} queries executed, budget is {}:\n{}'.format(
+                len(context), queries, '\n'.join(
+                    '{} {}. {}'.format(
+                        '+' if index > queries else ' ', index, query['sql']
+                    )
+                    for index, query in enumerate(context.captured_queries, 1)
+                )
+            ))
+        if seconds is not None and elapsed > seconds:
+            self.fail('Took {:.3f}s, budget is {}s'.format(elapsed, seconds))
 
-from . import models
 
-EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
+def budget(queries=None, seconds=None, using='default'):
+    """Decorate test method to assert its whole budget."""
+    def decorator(test_method):
+        @functools.wraps(test_method)
+        def wrapper(self, *args, **kwargs):
+            with self.assertBudget(queries, seconds, using):
+                return test_method(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
-class CompositeDocstringTestCase(test.TestCase):
+class CompositeDocstringTestCase(BudgetTestMixin, test.TestCase):
 
     """Test case with composite docstring."""
 
@@ -26,7 +127,7 @@ class CompositeDocstringTestCase(test.TestCase):
                 )
         return cls
 
-@test.override_settings(EMAIL_BACKEND=EMAIL_BACKEND)
+
 class RegistrationTest(CompositeDocstringTestCase):
 
     """Test registration"""
@@ -47,6 +148,23 @@ class RegistrationTest(CompositeDocstringTestCase):
 
         self.assertEqual(get_user_model().objects.all().count(), 1)
 
+    def test_with_email_in_other_case(self):
+        """With email in other case."""
+        payload = {
+            'email': 'test@mail.com', 'name': 'Test', 'surname': 'Test',
+            'password': 'pass'
+        }
+        get_user_model().objects.create_user(**payload)
+        payload.update(email='Test@Mail.com', confirm_password='pass')
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(get_user_model().objects.all().count(), 1)
+        self.assertFormError(
+            response, 'form', 'email',
+            forms.RegistrationForm.EMAIL_ALREADY_USED
+        )
+
     def test_success(self):
         """Success."""
         payload = {
@@ -54,7 +172,8 @@ class RegistrationTest(CompositeDocstringTestCase):
             'password': 'pass', 'confirm_password': 'pass'
         }
 
-        self.client.post(self.url, data=payload)
+        with self.assertBudget(queries=7, seconds=1):
+            self.client.post(self.url, data=payload)
         user = get_user_model().objects.get(email=payload['email'])
 
         self.assertEqual(get_user_model().objects.all().count(), 1)
@@ -62,6 +181,9 @@ class RegistrationTest(CompositeDocstringTestCase):
         self.assertFalse(user.is_active)
         self.assertFalse(user.is_staff)
         self.assertFalse(user.is_superuser)
+        self.assertTrue(
+            models.OutgoingEmail.objects.filter(email=user.email).exists()
+        )
 
 
 class VerificationTest(CompositeDocstringTestCase):
@@ -70,6 +192,18 @@ class VerificationTest(CompositeDocstringTestCase):
 
     client = test.Client()
 
+    def test_code_is_kept_on_save(self):
+        """Code is kept on save."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+        verification = models.Verification.objects.create(user=user)
+        code = verification.code
+
+        verification.save()
+
+        self.assertEqual(models.Verification.objects.get().code, code)
+
     def test_with_wrong_code(self):
         """With wrong code."""
         user = get_user_model().objects.create_user(
@@ -91,13 +225,25 @@ class VerificationTest(CompositeDocstringTestCase):
         code = models.Verification.objects.create(user=user).code
         url = reverse('users:verification', kwargs={'code': code})
 
-        self.client.get(url)
+        with self.assertBudget(queries=2, seconds=1):
+            self.client.get(url)
         user.refresh_from_db()
 
         self.assertTrue(user.is_active)
+        self.assertFalse(models.Verification.objects.exists())
+
+    def test_repeated(self):
+        """Repeated activation does nothing."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+        code = models.Verification.objects.create(user=user).code
+
+        self.assertTrue(models.Verification.objects.activate(code))
+        with self.assertBudget(queries=1):
+            self.assertFalse(models.Verification.objects.activate(code))
 
 
-@test.override_settings(EMAIL_BACKEND=EMAIL_BACKEND)
 class ReverificationTest(CompositeDocstringTestCase):
 
     """Test reverification"""
@@ -115,8 +261,34 @@ class ReverificationTest(CompositeDocstringTestCase):
 
         self.assertTrue(models.Verification.objects.filter(user=user).exists())
 
+    def test_repeated(self):
+        """Repeated request reuses verification."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+
+        self.client.post(self.url, data={'email': user.email})
+        self.client.post(self.url, data={'email': user.email})
+
+        self.assertEqual(models.Verification.objects.count(), 1)
+        self.assertEqual(models.OutgoingEmail.objects.count(), 1)
+
+    @test.override_settings(
+        USERS_VERIFICATION_RESEND_WINDOW=0, USERS_VERIFICATION_MAX_ACTIVE=2
+    )
+    def test_max_active(self):
+        """Count of active verifications is limited."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+
+        for _ in range(3):
+            self.client.post(self.url, data={'email': user.email})
+
+        self.assertEqual(models.Verification.objects.count(), 2)
+        self.assertEqual(models.OutgoingEmail.objects.count(), 2)
+
 
-@test.override_settings(EMAIL_BACKEND=EMAIL_BACKEND)
 class RestorePasswordRequestTest(CompositeDocstringTestCase):
 
     """Test create request to restore password"""
@@ -146,11 +318,887 @@ class RestorePasswordChangeTest(CompositeDocstringTestCase):
         user = get_user_model().objects.create_user(
             email='test@mail.com', password='pass', name='Name', surname='Test'
         )
-        code = models.Verification.objects.create(user=user).code
+        code = models.Verification.objects.create(
+            user=user, purpose=models.Verification.PURPOSE_RESTORE_PASSWORD
+        ).code
         url = reverse('users:password.restore.change', kwargs={'code': code})
         payload = {'password': 'pass', 'confirm_password': 'pass'}
 
-        self.client.post(url, data=payload)
+        with self.assertBudget(queries=3, seconds=1):
+            self.client.post(url, data=payload)
         user.refresh_from_db()
 
         self.assertTrue(user.check_password(payload['password']))
+
+    def test_with_activation_code(self):
+        """With activation code."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+        code = models.Verification.objects.create(user=user).code
+        url = reverse('users:password.restore.change', kwargs={'code': code})
+        payload = {'password': 'new', 'confirm_password': 'new'}
+
+        self.client.post(url, data=payload)
+        user.refresh_from_db()
+
+        self.assertFalse(user.check_password(payload['password']))
+
+
+class OutgoingEmailTest(CompositeDocstringTestCase):
+
+    """Test outbox"""
+
+    def setUp(self):
+        tasks.send_email(
+            email='test@mail.com', subject='Subject', message='<p>Text</p>'
+        )
+
+    def test_success(self):
+        """Success."""
+        call_command('send_emails', stdout=six.StringIO())
+        outgoing_email = models.OutgoingEmail.objects.get()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@mail.com'])
+        self.assertIsNotNone(outgoing_email.sent)
+        self.assertEqual(outgoing_email.attempts, 1)
+
+    @test.override_settings(EMAIL_BACKEND=PENDING_EMAIL_BACKEND)
+    def test_claimed(self):
+        """Claimed while sent."""
+        tasks.send_outgoing_emails()
+
+        self.assertEqual(PendingEmailBackend.pending, 0)
+        self.assertEqual(models.OutgoingEmail.objects.get().attempts, 1)
+
+    @test.override_settings(EMAIL_BACKEND=FAILING_EMAIL_BACKEND)
+    def test_failure(self):
+        """Failure."""
+        sent, failed = tasks.send_outgoing_emails()
+        outgoing_email = models.OutgoingEmail.objects.get()
+
+        self.assertEqual((sent, failed), (0, 1))
+        self.assertIsNone(outgoing_email.sent)
+        self.assertEqual(outgoing_email.attempts, 1)
+        self.assertIn('Unavailable', outgoing_email.error)
+        self.assertFalse(
+            models.OutgoingEmail.objects.pending(max_attempts=5).exists()
+        )
+
+
+class BulkEmailTest(CompositeDocstringTestCase):
+
+    """Test bulk sending of verification emails"""
+
+    def setUp(self):
+        for index in range(5):
+            user = get_user_model().objects.create_user(
+                email='test{}@mail.com'.format(index), password='pass',
+                name='Name', surname='Test'
+            )
+            models.Verification.objects.create(user=user)
+        CountingEmailBackend.connections = 0
+
+    @test.override_settings(EMAIL_BACKEND=COUNTING_EMAIL_BACKEND)
+    def test_success(self):
+        """Success."""
+        failures = tasks.send_verification_emails(
+            models.Verification.objects.all(), chunk_size=2
+        )
+
+        self.assertEqual(failures, [])
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingEmailBackend.connections, 3)
+
+    @test.override_settings(EMAIL_BACKEND=FAILING_EMAIL_BACKEND)
+    def test_failure(self):
+        """Failure."""
+        failures = tasks.send_restore_password_emails(
+            models.Verification.objects.all()
+        )
+
+        self.assertEqual(len(failures), 5)
+        self.assertEqual(
+            sorted(message.to[0] for message, error in failures),
+            ['test{}@mail.com'.format(index) for index in range(5)]
+        )
+
+
+class EmailsTest(CompositeDocstringTestCase):
+
+    """Test email rendering"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+        self.verification = models.Verification.objects.create(user=user)
+
+    def test_plain_text_alternative(self):
+        """Plain text alternative."""
+        tasks.send_verification_emails([self.verification])
+        message, = mail.outbox
+        url = 'http://testserver{}'.format(reverse(
+            'users:verification', kwargs={'code': self.verification.code}
+        ))
+
+        self.assertIn(url, message.body)
+        self.assertNotIn('<p>', message.body)
+        self.assertEqual(message.alternatives[0][1], 'text/html')
+        self.assertIn(url, message.alternatives[0][0])
+
+    def test_restore_password_url(self):
+        """Restore password URL."""
+        tasks.send_restore_password_emails([self.verification])
+        url = 'http://testserver{}'.format(reverse(
+            'users:password.restore.change',
+            kwargs={'code': self.verification.code}
+        ))
+
+        self.assertIn(url, mail.outbox[0].body)
+        self.assertIn(url, mail.outbox[0].alternatives[0][0])
+
+    def test_compiled_once(self):
+        """Compiled once."""
+        compiled = emails.compile_email(emails.VERIFICATION)
+
+        self.assertIs(emails.compile_email(emails.VERIFICATION), compiled)
+
+    def test_parsed_once(self):
+        """No template is parsed after the first email."""
+        parsed = []
+        init = Template.__init__
+
+        def counting_init(template, *args, **kwargs):
+            parsed.append(template)
+            init(template, *args, **kwargs)
+
+        rendered = emails.render(emails.VERIFICATION, ['first', 'second'])
+        next(rendered)
+        Template.__init__ = counting_init
+        try:
+            for _ in rendered:
+                pass
+            list(emails.render(emails.VERIFICATION, ['third']))
+        finally:
+            Template.__init__ = init
+
+        self.assertEqual(parsed, [])
+
+    def test_outbox(self):
+        """Outbox."""
+        tasks.send_verification_email(self.verification)
+        outgoing_email = models.OutgoingEmail.objects.get()
+
+        self.assertNotIn('<p>', outgoing_email.message)
+        self.assertIn('<p>', outgoing_email.html_message)
+
+
+@test.override_settings(USERS_SIGNED_VERIFICATION=True)
+class SignedVerificationTest(CompositeDocstringTestCase):
+
+    """Test signed verification tokens"""
+
+    client = test.Client()
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+
+    def test_issue(self):
+        """Issue does not save verification."""
+        self.client.post(
+            reverse('users:reverification'), data={'email': self.user.email}
+        )
+
+        self.client.post(
+            reverse('users:reverification'), data={'email': self.user.email}
+        )
+
+        self.assertFalse(models.Verification.objects.exists())
+        self.assertEqual(models.OutgoingEmail.objects.count(), 1)
+
+    def test_activation(self):
+        """Activation token is single use."""
+        code = tokens.make_token(
+            self.user, models.Verification.PURPOSE_ACTIVATION
+        )
+        url = reverse('users:verification', kwargs={'code': code})
+
+        self.client.get(url)
+        self.user.refresh_from_db()
+
+        self.assertTrue(self.user.is_active)
+        self.assertRaises(
+            models.Verification.DoesNotExist,
+            models.Verification.objects.resolve,
+            code, models.Verification.PURPOSE_ACTIVATION
+        )
+
+    def test_restore_password(self):
+        """Restore password token is single use."""
+        code = tokens.make_token(
+            self.user, models.Verification.PURPOSE_RESTORE_PASSWORD
+        )
+        url = reverse('users:password.restore.change', kwargs={'code': code})
+        payload = {'password': 'new', 'confirm_password': 'new'}
+
+        self.client.post(url, data=payload)
+        self.user.refresh_from_db()
+
+        self.assertTrue(self.user.check_password(payload['password']))
+        self.assertIsNone(tokens.check_token(
+            code, models.Verification.PURPOSE_RESTORE_PASSWORD,
+            models.Verification.LIFETIME
+        ))
+
+    def test_with_wrong_purpose(self):
+        """With wrong purpose."""
+        code = tokens.make_token(
+            self.user, models.Verification.PURPOSE_ACTIVATION
+        )
+
+        self.assertIsNone(tokens.check_token(
+            code, models.Verification.PURPOSE_RESTORE_PASSWORD,
+            models.Verification.LIFETIME
+        ))
+
+    def test_expired(self):
+        """Expired."""
+        lifetime = models.Verification.LIFETIME
+        code = tokens.make_token(
+            self.user, models.Verification.PURPOSE_ACTIVATION,
+            timestamp=int(time.time() - lifetime.total_seconds()) - 1
+        )
+
+        self.assertIsNone(tokens.check_token(
+            code, models.Verification.PURPOSE_ACTIVATION, lifetime
+        ))
+
+
+class PurgeVerificationsTest(CompositeDocstringTestCase):
+
+    """Test purge of expired verifications"""
+
+    def test_success(self):
+        """Success."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name', surname='Test'
+        )
+        for index in range(5):
+            models.Verification.objects.create(
+                user=user, expired=timezone.now() - timezone.timedelta(days=1)
+            )
+        active = models.Verification.objects.create(user=user)
+        stdout = six.StringIO()
+
+        call_command(
+            'purge_verifications', batch_size=2, sleep=0, stdout=stdout
+        )
+
+        self.assertEqual(
+            list(models.Verification.objects.values_list('pk', flat=True)),
+            [active.pk]
+        )
+        self.assertIn('Deleted 5 verifications', stdout.getvalue())
+
+
+@test.override_settings(USERS_HASHING_POOL_SIZE=1, USERS_HASHING_QUEUE_SIZE=0)
+class HashingPoolTest(CompositeDocstringTestCase):
+
+    """Test password hashing pool"""
+
+    client = test.Client()
+
+    def test_run(self):
+        """Run."""
+        pool = hashing.HashingPool(size=1, queue_size=0, timeout=0)
+
+        self.assertEqual(pool.run(max, 1, 2), 2)
+        self.assertEqual(pool.stats()['completed'], 1)
+
+    def test_saturated(self):
+        """Saturated pool rejects callers."""
+        pool = hashing.HashingPool(size=1, queue_size=1, timeout=0)
+
+        with pool.slot():
+            self.assertRaises(hashing.PoolSaturated, pool.run, max, 1, 2)
+
+        self.assertEqual(pool.stats()['rejected'], 1)
+        self.assertEqual(pool.stats()['waiting'], 0)
+
+    def test_authentication_when_saturated(self):
+        """Authentication responds 503 when pool is saturated."""
+        url = reverse('users:authentication')
+        payload = {'email': 'test@mail.com', 'password': 'pass'}
+
+        with hashing.get_pool().slot():
+            response = self.client.post(url, data=payload)
+
+        self.assertEqual(response.status_code, 503)
+
+
+@test.override_settings(
+    USERS_LOGIN_THROTTLE_EMAIL_LIMIT=3, USERS_LOGIN_THROTTLE_IP_LIMIT=5
+)
+class AuthenticationThrottlingTest(CompositeDocstringTestCase):
+
+    """Test authentication throttling"""
+
+    url = reverse('users:authentication')
+    client = test.Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_limiter(self):
+        """Limiter."""
+        limiter = throttling.SlidingWindowLimiter('test', limit=2, window=60)
+
+        limiter.hit('first')
+        self.assertFalse(limiter.is_limited('first'))
+        limiter.hit('first')
+
+        self.assertTrue(limiter.is_limited('first'))
+        self.assertFalse(limiter.is_limited('second'))
+
+    def test_email_limit(self):
+        """Email limit."""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name',
+            surname='Test', is_active=True
+        )
+        for _ in range(3):
+            self.client.post(
+                self.url, data={'email': user.email, 'password': 'wrong'}
+            )
+
+        response = self.client.post(
+            self.url, data={'email': user.email, 'password': 'pass'}
+        )
+
+        self.assertContains(
+            response, views.AuthenticationView.TOO_MANY_ATTEMPTS
+        )
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_ip_limit(self):
+        """IP limit."""
+        for index in range(5):
+            self.client.post(self.url, data={
+                'email': 'test{}@mail.com'.format(index), 'password': 'wrong'
+            })
+
+        response = self.client.post(
+            self.url, data={'email': 'test@mail.com', 'password': 'wrong'}
+        )
+
+        self.assertContains(
+            response, views.AuthenticationView.TOO_MANY_ATTEMPTS
+        )
+
+
+class CachedModelBackendTest(CompositeDocstringTestCase):
+
+    """Test cached authentication backend"""
+
+    def setUp(self):
+        cache.clear()
+        self.backend = backends.CachedModelBackend()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com', password='pass', name='Name',
+            surname='Test', is_active=True
+        )
+
+    def test_get_user(self):
+        """Get user from cache."""
+        self.backend.get_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+
+        self.assertEqual(user.email, self.user.email)
+        self.assertEqual(
+            user.get_session_auth_hash(), self.user.get_session_auth_hash()
+        )
+
+    def test_invalidation(self):
+        """Snapshot is removed on save."""
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(snapshots.load(self.user.pk))
+
+    def test_save_snapshot(self):
+        """Save of snapshot keeps password."""
+        self.backend.get_user(self.user.pk)
+        user = self.backend.get_user(self.user.pk)
+
+        user.name = 'Other'
+        user.save()
+        self.user.refresh_from_db()
+
+        self.assertEqual(self.user.name, 'Other')
+        self.assertTrue(self.user.check_password('pass'))
+
+    def test_password_change(self):
+        """Change password of user loaded from snapshot."""
+        self.user.is_staff = True
+        self.user.save()
+        client = test.Client()
+        client.force_login(self.user)
+        client.get(reverse('admin:index'))
+
+        response = client.get(reverse('admin:index'))
+        self.assertContains(response, reverse('admin:password_change'))
+
+        client.post(reverse('admin:password_change'), data={
+            'old_password': 'pass', 'new_password1': 'other-pass',
+            'new_password2': 'other-pass',
+        })
+        self.user.refresh_from_db()
+
+        self.assertTrue(self.user.check_password('other-pass'))
+
+
+class PurgeSessionsTest(CompositeDocstringTestCase):
+
+    """Test purge of expired sessions"""
+
+    def test_success(self):
+        """Success."""
+        now = timezone.now()
+        for index in range(3):
+            Session.objects.create(
+                session_key='expired{}'.format(index), session_data='',
+                expire_date=now - timezone.timedelta(days=1)
+            )
+        Session.objects.create(
+            session_key='active', session_data='',
+            expire_date=now + timezone.timedelta(days=1)
+        )
+
+        call_command(
+            'purge_sessions', batch_size=2, sleep=0, stdout=six.StringIO()
+        )
+
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['active']
+        )
+
+
+class ImportUsersTest(CompositeDocstringTestCase):
+
+    """Test import of users"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        get_user_model().objects.create_user(
+            email='used@mail.com', password='pass', name='Name',
+            surname='Test'
+        )
+
+    def write(self, name, content):
+        """Write input file."""
+        path = os.path.join(self.directory, name)
+        with io.open(path, 'w', encoding='utf-8') as input_file:
+            input_file.write(content)
+        return path
+
+    def read_rejected(self, path):
+        """Read reasons of rejected rows."""
+        with io.open(path + '.rejected.jsonl', encoding='utf-8') as output:
+            return [json.loads(line)['reason'] for line in output]
+
+    def test_csv(self):
+        """CSV."""
+        path = self.write('users.csv', (
+            u'email,name,surname,password,is_active\n'
+            u'First@Mail.com,First,Test,pass,1\n'
+            u'second@mail.com,Second,Test,pass,0\n'
+            u'first@mail.com,Duplicate,Test,pass,1\n'
+            u'USED@mail.com,Used,Test,pass,1\n'
+            u'invalid,Invalid,Test,pass,1\n'
+        ))
+
+        call_command(
+            'import_users', path, processes=0, batch_size=3,
+            stdout=six.StringIO()
+        )
+        user = get_user_model().objects.get(email='first@mail.com')
+
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertTrue(user.is_active)
+        self.assertTrue(user.check_password('pass'))
+        self.assertEqual(
+            sorted(self.read_rejected(path)),
+            ['Duplicate email in file', 'Email already used', 'Invalid email']
+        )
+
+    def test_csv_extra_fields(self):
+        """CSV with extra fields."""
+        path = self.write('users.csv', (
+            u'email,name,surname,password\n'
+            u'first@mail.com,First,Test,pass\n'
+            u'extra@mail.com,Extra,Test,pass,EXTRA\n'
+        ))
+
+        call_command(
+            'import_users', path, processes=0, stdout=six.StringIO()
+        )
+
+        self.assertTrue(
+            get_user_model().objects.filter(email='first@mail.com').exists()
+        )
+        self.assertEqual(self.read_rejected(path), ['Invalid row'])
+
+    def test_jsonl(self):
+        """JSON lines with password hash."""
+        password_hash = make_password('pass')
+        path = self.write('users.jsonl', u'\n'.join([
+            json.dumps({
+                'email': 'test@mail.com', 'name': 'Name', 'surname': 'Test',
+                'password_hash': password_hash
+            }),
+            json.dumps({
+                'email': 'other@mail.com', 'name': 'Name', 'surname': 'Test',
+                'password_hash': 'plain'
+            }),
+            u'{',
+        ]))
+
+        call_command('import_users', path, processes=0, stdout=six.StringIO())
+
+        self.assertEqual(
+            get_user_model().objects.get(email='test@mail.com').password,
+            password_hash
+        )
+        self.assertEqual(
+            self.read_rejected(path), ['Unknown password hash', 'Invalid row']
+        )
+
+
+class ExportUsersTest(CompositeDocstringTestCase):
+
+    """Test export of users"""
+
+    client = test.Client()
+
+    def setUp(self):
+        for index in range(5):
+            get_user_model().objects.create_user(
+                email='test{}@mail.com'.format(index), password='pass',
+                name=u'N\xe1me', surname='Test', is_active=bool(index % 2)
+            )
+
+    def test_chunks(self):
+        """Export by chunks."""
+        with self.assertNumQueries(3):
+            lines = list(exports.export(
+                get_user_model().objects.all(), 'jsonl', chunk_size=2
+            ))
+
+        self.assertEqual(
+            [json.loads(line)['email'] for line in lines],
+            ['test{}@mail.com'.format(index) for index in range(5)]
+        )
+
+    def test_command(self):
+        """Command with filter."""
+        stdout = six.StringIO()
+
+        call_command(
+            'export_users', is_active='1', chunk_size=1, stdout=stdout
+        )
+        rows = list(csv.DictReader(six.StringIO(stdout.getvalue())))
+
+        self.assertEqual(
+            [row['email'] for row in rows],
+            ['test1@mail.com', 'test3@mail.com']
+        )
+
+    def test_admin_action(self):
+        """Admin action."""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@mail.com', password='pass', name='Name',
+            surname='Test'
+        )
+        self.client.force_login(admin)
+        users = get_user_model().objects.filter(is_active=False)
+
+        response = self.client.post(
+            reverse('admin:users_user_changelist'), data={
+                'action': 'export_jsonl',
+                '_selected_action': [user.pk for user in users]
+            }
+        )
+        lines = list(response.streaming_content)
+
+        self.assertEqual(len(lines), users.count())
+
+
+class UserAdminTest(CompositeDocstringTestCase):
+
+    """Test users admin"""
+
+    client = test.Client()
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@mail.com', password='pass', name='Name',
+            surname='Admin'
+        )
+        for surname in ('Smith', 'Jones', 'Smithson'):
+            get_user_model().objects.create_user(
+                email='{}@mail.com'.format(surname.lower()), password='pass',
+                name='Name', surname=surname
+            )
+        self.client.force_login(self.admin)
+
+    def search(self, term):
+        """Search users in admin."""
+        response = self.client.get(
+            reverse('admin:users_user_changelist'), data={'q': term}
+        )
+        return sorted(
+            user.surname for user in response.context['cl'].result_list
+        )
+
+    def action(self, action, users):
+        """Run admin action."""
+        return self.client.post(
+            reverse('admin:users_user_changelist'), data={
+                'action': action,
+                '_selected_action': [user.pk for user in users]
+            }
+        )
+
+    def test_activate(self):
+        """Activate users."""
+        users = get_user_model().objects.filter(is_active=False)
+
+        self.action('activate', users)
+
+        self.assertFalse(get_user_model().objects.filter(
+            is_active=False
+        ).exists())
+
+    def test_deactivate(self):
+        """Deactivate users."""
+        get_user_model().objects.update(is_active=True)
+        users = get_user_model().objects.filter(surname__startswith='Smith')
+
+        self.action('deactivate', users)
+
+        self.assertEqual(
+            get_user_model().objects.filter(is_active=False).count(), 2
+        )
+
+    def test_resend_verification(self):
+        """Resend verification."""
+        users = get_user_model().objects.all()
+
+        self.action('resend_verification', users)
+
+        self.assertEqual(models.Verification.objects.count(), 3)
+        self.assertEqual(models.OutgoingEmail.objects.count(), 3)
+
+    def test_search(self):
+        """Search."""
+        self.assertEqual(self.search('smi'), ['Smith', 'Smithson'])
+        self.assertEqual(self.search('JONES@'), ['Jones'])
+        self.assertEqual(self.search('mith'), [])
+
+    def test_estimated_count(self):
+        """Estimated count."""
+        estimate_count = paginators.estimate_count
+        paginators.estimate_count = lambda model, using: 1000
+        try:
+            paginator = paginators.EstimatedCountPaginator(
+                get_user_model().objects.all(), per_page=10
+            )
+            paginator.threshold = 1
+
+            self.assertEqual(paginator.count, 1000)
+            self.assertEqual(paginator.num_pages, 100)
+        finally:
+            paginators.estimate_count = estimate_count
+
+    def test_sqlite_count(self):
+        """Exact count on SQLite, which has no estimate."""
+        get_user_model().objects.filter(surname='Jones').delete()
+        paginator = paginators.EstimatedCountPaginator(
+            get_user_model().objects.all(), per_page=10
+        )
+        paginator.threshold = 1
+
+        self.assertIsNone(
+            paginators.estimate_count(get_user_model(), 'default')
+        )
+        self.assertEqual(paginator.count, 3)
+
+    def test_exact_count(self):
+        """Exact count of filtered users."""
+        paginator = paginators.EstimatedCountPaginator(
+            get_user_model().objects.filter(is_superuser=False), per_page=10
+        )
+        paginator.threshold = 1
+
+        self.assertEqual(paginator.count, 3)
+
+
+@test.override_settings(USERS_PERFORMANCE_SAMPLE_RATE=1)
+class PerformanceMiddlewareTest(CompositeDocstringTestCase):
+
+    """Test performance middleware"""
+
+    url = reverse('users:registration')
+    client = test.Client()
+
+    def timings(self, response):
+        """Get names of timings in Server-Timing header."""
+        return sorted(
+            metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')
+        )
+
+    def test_render(self):
+        """Render."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(self.timings(response), ['render', 'total'])
+
+    def test_hashing_pool_stats(self):
+        """Hashing pool stats."""
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.getLogger('users.performance')
+        logger.addHandler(handler)
+        try:
+            self.client.get(self.url)
+        finally:
+            logger.removeHandler(handler)
+        metrics = json.loads(records[-1].getMessage())
+
+        self.assertEqual(
+            sorted(metrics['hashing']),
+            ['active', 'completed', 'rejected', 'size', 'waiting']
+        )
+
+    def test_hash_and_email(self):
+        """Hash and email."""
+        payload = {
+            'email': 'test@mail.com', 'name': 'Test', 'surname': 'Test',
+            'password': 'pass', 'confirm_password': 'pass'
+        }
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(
+            self.timings(response), ['db', 'email', 'hash', 'total']
+        )
+
+    @test.override_settings(USERS_PERFORMANCE_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        """Not sampled."""
+        response = self.client.get(self.url)
+
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class BudgetTest(CompositeDocstringTestCase):
+
+    """Test budget assertions"""
+
+    def test_queries_exceeded(self):
+        """Queries exceeded."""
+        with self.assertRaises(AssertionError) as context:
+            with self.assertBudget(queries=1):
+                list(get_user_model().objects.all())
+                list(models.Verification.objects.all())
+
+        message = six.text_type(context.exception)
+        self.assertIn('2 queries executed, budget is 1', message)
+        self.assertIn('  1. SELECT', message)
+        self.assertIn('+ 2. SELECT', message)
+        self.assertIn('users_verification', message.splitlines()[-1])
+
+    def test_seconds_exceeded(self):
+        """Seconds exceeded."""
+        with self.assertRaises(AssertionError):
+            with self.assertBudget(seconds=0.01):
+                time.sleep(0.02)
+
+    @budget(queries=1, seconds=1)
+    def test_decorator(self):
+        """Decorator."""
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class WarmupTest(CompositeDocstringTestCase):
+
+    """Test warm up"""
+
+    @test.override_settings(TEMPLATES=[dict(
+        settings.TEMPLATES[0], APP_DIRS=False, OPTIONS=dict(
+            settings.TEMPLATES[0]['OPTIONS'], loaders=[
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ]
+        )
+    )])
+    def test_templates(self):
+        """Templates."""
+        warmup.templates()
+        loader, = engines['django'].engine.template_loaders
+
+        names = [
+            template.origin.template_name
+            for template in loader.get_template_cache.values()
+        ]
+        self.assertIn('base.html', names)
+        self.assertIn('users/registration.html', names)
+
+    def test_run(self):
+        """Run."""
+        durations = warmup.run()
+
+        self.assertEqual(
+            [name for name, _ in durations],
+            ['urls', 'templates', 'database', 'hashers']
+        )
+
+
+class ProfileStartupTest(CompositeDocstringTestCase):
+
+    """Test startup profiling"""
+
+    def test_json(self):
+        """JSON."""
+        output = six.StringIO()
+
+        call_command(
+            'profile_startup', format='json', path=['/users/registration/'],
+            stdout=output
+        )
+        profile = json.loads(output.getvalue())
+        apps = dict((app['name'], app['used']) for app in profile['apps'])
+
+        self.assertEqual(
+            [phase['name'] for phase in profile['phases']],
+            ['settings', 'apps', 'admin', 'urls']
+        )
+        self.assertIn('users.models', [
+            module['name'] for module in profile['modules']
+        ])
+        self.assertTrue(apps['users'])
+        self.assertFalse(apps['django.contrib.admin'])
@@ -0,0 +1,87 @@
+# coding=utf-8
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class SlidingWindowLimiter(object):
+
+    """Sliding window counter of attempts stored in the cache.
+
+    Window is approximated by counters of the current and previous fixed
+    windows, the previous one weighted by its part still inside the window.
+    """
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _keys(self, identity, now):
+        """Get keys of current and previous windows."""
+        identity = hashlib.md5(identity.encode('utf-8')).hexdigest()
+        index = int(now // self.window)
+        return [
+            'users:throttling:{}:{}:{}'.format(self.scope, identity, index)
+            for index in (index, index - 1)
+        ]
+
+    def count(self, identity):
+        """Get count of attempts in the window."""
+        now = time.time()
+        current, previous = self._keys(identity, now)
+        counters = cache.get_many([current, previous])
+        elapsed = (now % self.window) / self.window
+        return (
+            counters.get(current, 0) +
+            counters.get(previous, 0) * (1 - elapsed)
+        )
+
+    def is_limited(self, identity):
+        """Check whether identity is over the limit."""
+        return self.count(identity) >= self.limit
+
+    def hit(self, identity):
+        """Register attempt."""
+        key = self._keys(identity, time.time())[0]
+        cache.add(key, 0, self.window * 2)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, self.window * 2)
+
+
+def get_login_limiters(request, email):
+    """Get pairs of limiter and identity for authentication request."""
+    window = settings.USERS_LOGIN_THROTTLE_WINDOW
+    return (
+        (
+            SlidingWindowLimiter(
+                'email', settings.USERS_LOGIN_THROTTLE_EMAIL_LIMIT, window
+            ),
+            email.lower()
+        ),
+        (
+            SlidingWindowLimiter(
+                'ip', settings.USERS_LOGIN_THROTTLE_IP_LIMIT, window
+            ),
+            request.META.get('REMOTE_ADDR', '')
+        ),
+    )
+
+
+def is_login_limited(request, email):
+    """Check whether authentication attempt must be rejected."""
+    return any(
+        limiter.is_limited(identity)
+        for limiter, identity in get_login_limiters(request, email)
+    )
+
+
+def register_failed_login(request, email):
+    """Register failed authentication attempt."""
+    for limiter, identity in get_login_limiters(request, email):
+        limiter.hit(identity)
@@ -0,0 +1,48 @@
+# coding=utf-8
+
+import contextlib
+import threading
+import time
+
+_local = threading.local()
+
+
+class Timings(object):
+
+    """Durations of named parts of a request."""
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+
+    def add(self, name, duration):
+        """Add duration (seconds) of part."""
+        self.durations[name] = self.durations.get(name, 0) + duration
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+
+def start():
+    """Start collecting timings in the current thread."""
+    _local.timings = Timings()
+    return _local.timings
+
+
+def stop():
+    """Stop collecting timings in the current thread, get them."""
+    timings = getattr(_local, 'timings', None)
+    _local.timings = None
+    return timings
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Measure duration of the block if timings are collected."""
+    timings = getattr(_local, 'timings', None)
+    if timings is None:
+        yield
+        return
+    started = time.time()
+    try:
+        yield
+    finally:
+        timings.add(name, time.time() - started)
@@ -0,0 +1,59 @@
+# coding=utf-8
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.utils import crypto
+from django.utils.http import base36_to_int, int_to_base36
+
+KEY_SALT = 'users.tokens'
+
+
+def make_token(user, purpose, timestamp=None):
+    """Make signed verification token for user and purpose.
+
+    Token is `<user id>_<timestamp>_<signature>` (base36), so it fits the
+    `\\w+` code of the users URLs.
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    return '{}_{}_{}'.format(
+        int_to_base36(user.pk), int_to_base36(timestamp),
+        _signature(user, purpose, timestamp)
+    )
+
+
+def check_token(token, purpose, lifetime):
+    """Get user of valid token, `None` if token is invalid or expired.
+
+    Signature covers the password hash and active state of the user, so
+    token is invalidated as soon as password is changed or user activated.
+    """
+    try:
+        pk, timestamp, signature = token.split('_')
+        pk, timestamp = base36_to_int(pk), base36_to_int(timestamp)
+    except (AttributeError, ValueError):
+        return None
+
+    if time.time() - timestamp > lifetime.total_seconds():
+        return None
+
+    try:
+        user = get_user_model().objects.get(pk=pk)
+    except get_user_model().DoesNotExist:
+        return None
+
+    if not crypto.constant_time_compare(
+        signature, _signature(user, purpose, timestamp)
+    ):
+        return None
+
+    return user
+
+
+def _signature(user, purpose, timestamp):
+    """Sign user state, purpose and timestamp."""
+    value = u'{}{}{}{}{}'.format(
+        user.pk, user.password, user.is_active, purpose, timestamp
+    )
+    return crypto.salted_hmac(KEY_SALT, value).hexdigest()[::2]
@@ -0,0 +1,26 @@
+# coding=utf-8
+
+import time
+
+
+def delete_in_batches(queryset, batch_size=1000, interval=0):
+    """Delete queryset rows in primary key ordered batches.
+
+    Every batch is a separate short statement, so table is not locked for
+    the whole deletion. Sleep `interval` seconds between batches. Return
+    count of deleted rows.
+    """
+    manager = queryset.model._base_manager
+    deleted = 0
+    while True:
+        pks = list(
+            queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            break
+        count, _ = manager.filter(pk__in=pks).delete()
+        deleted += count
+        if len(pks) < batch_size:
+            break
+        time.sleep(interval)
+    return deleted
@@ -1,5 +1,6 @@
 # coding=utf-8
 
+from django.conf import settings
 from django.shortcuts import redirect
 from django.views.generic import FormView, RedirectView
 from django.contrib import messages
@@ -7,7 +8,7 @@ from django.core.urlresolvers import reverse_lazy
 from django.contrib import auth
 from django.utils.translation import ugettext_lazy as _
 
-from . import forms, mixins, models
+from . import forms, hashing, mixins, models, throttling
 
 
 class RegistrationView(mixins.AnonymousOnlyViewMixin, FormView):
@@ -22,7 +23,8 @@ class RegistrationView(mixins.AnonymousOnlyViewMixin, FormView):
 
     def form_valid(self, form):
         """Action if form is valid."""
-        form.save()
+        if form.save() is None:
+            return self.form_invalid(form)
         messages.success(self.request, self.SUCCESSFUL_REGISTRATION)
         return super(RegistrationView, self).form_valid(form)
 
@@ -34,16 +36,16 @@ class VerificationView(RedirectView):
     permanent = True
     pattern_name = 'users:authentication'
 
+    SUCCESSFUL_VERIFICATION = _('Your account is activated')
+    VERIFICATION_FAILED = _('Verification link is invalid or expired')
+
     def dispatch(self, *args, **kwargs):
         """Dispatch request."""
         code = self.kwargs.get('code', None)
-        try:
-            verification = models.Verification.objects.active().get(code=code)
-            verification.user.is_active = True
-            verification.user.save()
-            verification.delete()
-        except models.Verification.DoesNotExist:
-            pass
+        if models.Verification.objects.activate(code):
+            messages.success(self.request, self.SUCCESSFUL_VERIFICATION)
+        else:
+            messages.error(self.request, self.VERIFICATION_FAILED)
         return redirect(reverse_lazy(self.pattern_name))
 
 
@@ -78,8 +80,8 @@ class RestorePasswordChangeView(FormView):
         """Dispatch request."""
         code = self.kwargs.get('code', None)
         try:
-            self.verification = models.Verification.objects.active().get(
-                code=code
+            self.verification = models.Verification.objects.resolve(
+                code, models.Verification.PURPOSE_RESTORE_PASSWORD
             )
         except models.Verification.DoesNotExist:
             return redirect(reverse_lazy('users:authentication'))
@@ -89,7 +91,7 @@ class RestorePasswordChangeView(FormView):
         """Action if form is valid."""
         form.user = self.verification.user
         form.save()
-        self.verification.delete()
+        self.verification.consume()
         messages.success(self.request, self.PASSWORD_CHANGED)
         return super(RestorePasswordChangeView, self).form_valid(form)
 
@@ -117,19 +119,26 @@ class AuthenticationView(mixins.AnonymousOnlyViewMixin, FormView):
 
     form_class = forms.AuthenticationForm
     template_name = 'users/authentication.html'
-    success_url = reverse_lazy('')
+    success_url = settings.LOGIN_REDIRECT_URL
 
     USER_IS_INACTIVE = _('User is inactive')
     AUTHENTICATION_ERROR = (
         'User with such email is not registered or password is incorrect'
     )
+    TOO_MANY_ATTEMPTS = _('Too many failed attempts, try again later')
 
     def form_valid(self, form):
         """Action if form is valid."""
         email = form.cleaned_data['email']
         password = form.cleaned_data['password']
 
-        user = auth.authenticate(username=email, password=password)
+        if throttling.is_login_limited(self.request, email):
+            messages.error(self.request, self.TOO_MANY_ATTEMPTS)
+            return super(AuthenticationView, self).form_invalid(form)
+
+        user = hashing.run(
+            auth.authenticate, username=email, password=password
+        )
         if user is not None:
             if user.is_active:
                 auth.login(self.request, user)
@@ -137,6 +146,7 @@ class AuthenticationView(mixins.AnonymousOnlyViewMixin, FormView):
                 messages.error(self.request, self.USER_IS_INACTIVE)
                 return super(AuthenticationView, self).form_invalid(form)
         else:
+            throttling.register_failed_login(self.request, email)
             messages.error(self.request, self.AUTHENTICATION_ERROR,)
             return super(AuthenticationView, self).form_invalid(form)
 
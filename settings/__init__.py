@@ -1,9 +1,13 @@
 # coding=utf-8
 
+import os
+
 try:
     from .local import *
 except ImportError:
-    raise NotImplementedError(
-        'Start your WSGI server with needed settings'
-        ' or provide settings/local.py (for development only).'
-    )
+    # Profiles like `settings.test` are imported through this package too
+    if os.environ.get('DJANGO_SETTINGS_MODULE', 'settings') == 'settings':
+        raise NotImplementedError(
+            'Start your WSGI server with needed settings'
+            ' or provide settings/local.py (for development only).'
+        )
@@ -30,6 +30,7 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE_CLASSES = (
+    'users.middleware.PerformanceMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -38,6 +39,8 @@ MIDDLEWARE_CLASSES = (
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+
+    'users.middleware.HashingPoolMiddleware',
 )
 
 ROOT_URLCONF = 'urls'
@@ -60,6 +63,16 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'wsgi.application'
 
+# Load URLs, templates, database and hashers before worker accepts
+# requests, see `warmup.py`
+WARMUP = False
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 LOGS_DIR = os.path.join(BASE_DIR, '')
 
 LOGGING = {
@@ -96,6 +109,16 @@ LOGGING = {
             'filename': os.path.join(LOGS_DIR, 'exceptions.log'),
             'formatter': 'verbose'
         },
+        'performance': {
+            'level': 'INFO',
+            'class': 'logging.FileHandler',
+            'filename': os.path.join(LOGS_DIR, 'performance.log'),
+        },
+        'startup': {
+            'level': 'INFO',
+            'class': 'logging.StreamHandler',
+            'formatter': 'verbose',
+        },
     },
     'loggers': {
         'django': {
@@ -114,11 +137,55 @@ LOGGING = {
         'py.warnings': {
             'handlers': ['console'],
         },
+        'users.performance': {
+            'handlers': ['console', 'performance'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'users.hashing': {
+            'handlers': ['console', 'performance'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'warmup': {
+            'handlers': ['startup'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     }
 }
 
 AUTH_USER_MODEL = 'users.User'
 
+AUTHENTICATION_BACKENDS = ('users.backends.CachedModelBackend',)
+
+LOGIN_REDIRECT_URL = '/'
+
+# Use signed tokens instead of `users.Verification` rows for verification codes
+USERS_SIGNED_VERIFICATION = False
+# Reuse verification issued less than this count of seconds ago
+USERS_VERIFICATION_RESEND_WINDOW = 5 * 60
+# Reuse the latest verification when user has this count of active ones
+USERS_VERIFICATION_MAX_ACTIVE = 5
+
+# Count of concurrent password hashes, `None` for count of CPUs
+USERS_HASHING_POOL_SIZE = None
+# Count of requests waiting for hashing, others get 503 right away
+USERS_HASHING_QUEUE_SIZE = 32
+# Seconds to wait for hashing before 503
+USERS_HASHING_TIMEOUT = 5
+
+# Failed authentication attempts allowed per email and per IP in the window
+USERS_LOGIN_THROTTLE_WINDOW = 15 * 60
+USERS_LOGIN_THROTTLE_EMAIL_LIMIT = 5
+USERS_LOGIN_THROTTLE_IP_LIMIT = 50
+
+# Seconds to cache users loaded for authenticated requests
+USERS_USER_CACHE_TIMEOUT = 5 * 60
+
+# Part of requests measured by `users.middleware.PerformanceMiddleware`
+USERS_PERFORMANCE_SAMPLE_RATE = 0.01
+
 LANGUAGE_CODE = 'en'
 LANGUAGES = (
     ('en', _('English')),
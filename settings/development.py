@@ -8,5 +8,7 @@ ALLOWED_HOSTS = []
 
 INSTALLED_APPS += ('debug_toolbar',)
 
+USERS_PERFORMANCE_SAMPLE_RATE = 1
+
 STATICFILES_DIRS = [STATIC_ROOT]
 STATIC_ROOT = None
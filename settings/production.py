@@ -7,3 +7,28 @@ DEBUG = False
 HOST = '$CHANGE'
 
 ALLOWED_HOSTS = [HOST]
+
+# Templates are compiled once per worker, at its start with warm up
+TEMPLATES = [dict(TEMPLATES[0], APP_DIRS=False, OPTIONS=dict(
+    TEMPLATES[0]['OPTIONS'], loaders=[
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+))]
+WARMUP = True
+
+# Shared cache, sessions and throttling counters must be seen by all workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '$CHANGE',
+    },
+}
+
+# Sessions are read from the cache, database is only written on changes
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_SAVE_EVERY_REQUEST = False
+# Messages never touch the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
@@ -0,0 +1,30 @@
+# coding=utf-8
+
+from base import *
+
+HOST = 'http://testserver'
+
+DEFAULT_FROM_EMAIL = SERVER_EMAIL = 'noreply@testserver'
+
+# Forked processes of `test --parallel` get their own copy of the database
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+# Tables are created right from models
+MIGRATION_MODULES = dict(
+    (app.rsplit('.', 1)[-1], None) for app in INSTALLED_APPS
+)
+
+# Fast and insecure, for tests only
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Parallel processes must not write the same log files, nor to output
+LOGGING['handlers']['file'] = {'class': 'logging.NullHandler'}
+LOGGING['handlers']['performance'] = {'class': 'logging.NullHandler'}
+LOGGING['handlers']['startup'] = {'class': 'logging.NullHandler'}
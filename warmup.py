@@ -0,0 +1,112 @@
+# coding=utf-8
+
+"""Warm up worker before it accepts requests.
+
+Enabled by `WARMUP` setting, see `wsgi.py`. Every phase does the work the
+first request of a fresh worker would do otherwise and its time is logged.
+"""
+
+import logging
+import os
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.urlresolvers import get_resolver
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders import cached
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def urls():
+    """Import URLconf (with `admin.autodiscover()`) and build resolvers."""
+    resolvers = [get_resolver()]
+    while resolvers:
+        resolver = resolvers.pop()
+        resolver.reverse_dict
+        resolvers.extend(
+            sub_resolver
+            for _, sub_resolver in resolver.namespace_dict.values()
+        )
+
+
+def get_template_names(dirs):
+    """Get names of all templates in directories."""
+    names = set()
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    names.add(os.path.relpath(
+                        os.path.join(root, filename), directory
+                    ).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def templates():
+    """Compile all project and app templates, return count of compiled.
+
+    Only engines with the cached loader keep compiled templates, others are
+    skipped.
+    """
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates) or not any(
+            isinstance(loader, cached.Loader)
+            for loader in engine.engine.template_loaders
+        ):
+            continue
+        dirs = list(engine.engine.dirs) + list(
+            get_app_template_dirs('templates')
+        )
+        for name in get_template_names(dirs):
+            try:
+                engine.get_template(name)
+            except TemplateDoesNotExist:
+                continue
+            except TemplateSyntaxError as error:
+                logger.warning('Template %s is not compiled: %s', name, error)
+                continue
+            compiled += 1
+    return compiled
+
+
+def database():
+    """Import database drivers and check databases are reachable.
+
+    Connections are closed afterwards, servers which load the application
+    before forking workers (uWSGI by default, `gunicorn --preload`) would
+    share them between workers otherwise. So only driver import is warmed
+    up, every worker opens its own connection on the first request.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+        connection.close()
+
+
+def hashers():
+    """Load password hashers and hashing pool of users."""
+    from users import hashing
+
+    get_hashers()
+    hashing.get_pool()
+
+
+PHASES = (urls, templates, database, hashers)
+
+
+def run():
+    """Run all phases, return their durations in milliseconds."""
+    durations = []
+    for phase in PHASES:
+        started = time.time()
+        phase()
+        durations.append((phase.__name__, (time.time() - started) * 1000))
+        logger.info('Warm up %s: %.1fms', *durations[-1])
+    logger.info('Warm up: %.1fms', sum(duration for _, duration in durations))
+    return durations